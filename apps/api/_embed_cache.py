@@ -0,0 +1,88 @@
+"""
+On-disk response cache for the standalone integration test scripts
+
+Reruns of test_huggingface.py / test_openai.py embed the same literal
+sentences and send the same chat prompt every time; caching them by
+content hash keeps reruns from spending API quota. The cache is opt-in:
+set TESTS_USE_CACHE=1 to read and write it; otherwise every run calls the
+real API.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+import orjson
+
+# Bump when the cached payload format or the request shape changes
+EMBED_CACHE_VERSION = 1
+
+CACHE_DIR = Path(__file__).parent.parent.parent / '.cache' / 'emb'
+
+
+def _cache_enabled() -> bool:
+    return os.getenv('TESTS_USE_CACHE', '') == '1'
+
+
+def _fingerprint(model: str, payload: str) -> str:
+    key = f"{EMBED_CACHE_VERSION}\x00{model}\x00{payload}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+async def cached_batch_embed(
+    fn: Callable[[List[str], str], Awaitable[List[List[float]]]],
+    texts: List[str],
+    model: str,
+) -> List[List[float]]:
+    """Embed texts via fn, only sending the texts that are not cached yet"""
+    paths = [CACHE_DIR / f"{_fingerprint(model, text)}.npy" for text in texts]
+    found: Dict[int, List[float]] = {}
+    if _cache_enabled():
+        for i, path in enumerate(paths):
+            if path.exists():
+                found[i] = np.load(path).tolist()
+
+    if found:
+        print(f"   {len(found)}/{len(texts)} embeddings served from {CACHE_DIR} (TESTS_USE_CACHE=1)")
+
+    missing = [i for i in range(len(texts)) if i not in found]
+    if missing:
+        embeddings = await fn([texts[i] for i in missing], model)
+        # Results are matched to texts by position, so a short reply can't be used
+        if len(embeddings) != len(missing):
+            raise RuntimeError(
+                f"Expected {len(missing)} embeddings from {model}, got {len(embeddings)}"
+            )
+        if _cache_enabled():
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for i, embedding in zip(missing, embeddings):
+            if _cache_enabled():
+                np.save(paths[i], np.asarray(embedding, dtype=np.float64))
+            found[i] = embedding
+
+    return [found[i] for i in range(len(texts))]
+
+
+def _chat_path(model: str, messages: List[Dict[str, str]]) -> Path:
+    payload = orjson.dumps(messages, option=orjson.OPT_SORT_KEYS).decode('utf-8')
+    return CACHE_DIR / f"chat-{_fingerprint(model, payload)}.json"
+
+
+def load_cached_chat(model: str, messages: List[Dict[str, str]]) -> Optional[str]:
+    """Return the cached completion text for a chat prompt, if any"""
+    if not _cache_enabled():
+        return None
+    path = _chat_path(model, messages)
+    if not path.exists():
+        return None
+    return orjson.loads(path.read_bytes()).get('text')
+
+
+def save_cached_chat(model: str, messages: List[Dict[str, str]], text: str) -> None:
+    """Store the completion text for a chat prompt (only when the cache is enabled)"""
+    if not _cache_enabled():
+        return
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _chat_path(model, messages).write_bytes(orjson.dumps({'text': text}))
@@ -0,0 +1,34 @@
+"""
+Shared .env loader for the standalone integration test scripts
+"""
+
+import functools
+import os
+from pathlib import Path
+
+ENV_FILE = Path(__file__).parent.parent.parent / '.env'
+
+
+@functools.lru_cache(maxsize=1)
+def load_env() -> None:
+    """Load the repo-root .env into os.environ once per process.
+
+    Variables already set in the environment take precedence over the file.
+    """
+    if not ENV_FILE.exists():
+        return
+    try:
+        text = ENV_FILE.read_text(encoding='utf-8')
+    except Exception as e:
+        print(f"Warning: Could not load .env file: {e}")
+        return
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        key = key.strip()
+        # Remove surrounding quotes and null characters
+        value = value.strip().strip('"').strip("'").replace('\x00', '')
+        if key and value:
+            os.environ.setdefault(key, value)
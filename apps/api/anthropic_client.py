@@ -61,7 +61,7 @@ class AnthropicClient:
             # Just check if we have a key (no public endpoint to check)
             return bool(self.api_key)
         except Exception as e:
-            logger.debug(f"Anthropic check failed: {e}")
+            logger.debug("Anthropic check failed: %s", e)
             return bool(self.api_key)
 
     async def stream_chat(
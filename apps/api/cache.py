@@ -12,6 +12,7 @@ import redis.asyncio as redis
 from redis.exceptions import RedisError
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "64"))
 
 try:
     cache_client: Optional[redis.Redis] = redis.from_url(
@@ -19,6 +20,7 @@ try:
         encoding="utf-8",
         decode_responses=True,
         socket_connect_timeout=1,
+        max_connections=REDIS_MAX_CONNECTIONS,
     )
 except RedisError:
     cache_client = None
@@ -72,7 +72,7 @@ class HuggingFaceClient:
                 # (network issues, etc. - let actual calls handle errors)
                 return True
         except Exception as e:
-            logger.debug(f"Hugging Face check failed: {e}")
+            logger.debug("Hugging Face check failed: %s", e)
             # If we have an API key, assume it might work (network issues, etc.)
             return bool(self.api_key)
 
@@ -4,11 +4,17 @@ REST + WebSocket API for desktop and mobile clients
 """
 
 import asyncio
+import gc
+import logging
+import os
 import random
 from contextlib import asynccontextmanager, suppress
 
+import anyio.to_thread
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from apps.api import logging_config
 from apps.api.database import init_db
@@ -39,8 +45,17 @@ from apps.api.routes import (
     discipline,
     health as health_routes,
 )
+from apps.api.services import system_metrics
 from apps.api.telemetry import init_telemetry
 
+logger = logging.getLogger(__name__)
+
+# Sync (def) endpoints, e.g. the SQLAlchemy-backed ones, run on AnyIO's worker threads
+THREADPOOL_SIZE = int(os.getenv("API_THREADPOOL_SIZE", "100"))
+# Allocations between young-generation collections (CPython default: 700); fewer,
+# larger collections keep GC pauses out of most requests
+GC_GEN0_THRESHOLD = int(os.getenv("API_GC_GEN0_THRESHOLD", "50000"))
+
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
@@ -55,11 +70,17 @@ class ConnectionManager:
             self.active_connections.remove(websocket)
 
     async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except:
-                pass
+        # Serialize once for every subscriber and send to all of them concurrently,
+        # so one slow client doesn't hold up the rest
+        text = orjson.dumps(message).decode()
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(connection.send_text(text) for connection in connections),
+            return_exceptions=True,
+        )
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(connection)
 
 manager = ConnectionManager()
 metrics_manager = ConnectionManager()
@@ -68,13 +89,18 @@ metrics_task: asyncio.Task | None = None
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print("Regen API Server starting...")
+    logger.info("Regen API Server starting...")
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
     init_db()  # Initialize database tables
+    # Everything allocated so far (modules, routers, clients) lives for the whole
+    # process; move it out of the collector's view so collections only scan request garbage
+    gc.freeze()
+    gc.set_threshold(GC_GEN0_THRESHOLD, *gc.get_threshold()[1:])
     global metrics_task
     metrics_task = asyncio.create_task(metrics_publisher())
     yield
     # Shutdown
-    print("Regen API Server shutting down...")
+    logger.info("Regen API Server shutting down...")
     if metrics_task:
         metrics_task.cancel()
         with suppress(asyncio.CancelledError):
@@ -86,6 +112,8 @@ app = FastAPI(
     description="REST + WebSocket API for Regen",
     version="1.0.0",
     lifespan=lifespan,
+    # Route return values are rendered with orjson instead of stdlib json
+    default_response_class=ORJSONResponse,
 )
 configure_openapi(app)
 init_telemetry(app)
@@ -160,7 +188,6 @@ async def websocket_metrics(websocket: WebSocket):
 async def metrics_publisher() -> None:
     """Broadcast real-time performance metrics to connected clients."""
     import psutil
-    import os
     
     # Try to get real system metrics, fallback to mock if unavailable
     try:
@@ -176,13 +203,13 @@ async def metrics_publisher() -> None:
                 if process:
                     # System-wide CPU (primary metric)
                     try:
-                        system_cpu = psutil.cpu_percent(interval=0.1) or 0.0
+                        system_cpu = system_metrics.cpu_percent()
                     except Exception:
-                        system_cpu = process.cpu_percent(interval=0.1) or 0.0
+                        system_cpu = process.cpu_percent(interval=None) or 0.0
                     
                     # System-wide memory (primary metric)
                     try:
-                        memory_info = psutil.virtual_memory()
+                        memory_info = system_metrics.virtual_memory()
                         memory_percent = memory_info.percent or 0.0
                         memory_mb = memory_info.used / (1024 * 1024)  # Convert to MB
                     except Exception:
@@ -190,7 +217,7 @@ async def metrics_publisher() -> None:
                         memory_mb = process_memory.rss / (1024 * 1024)
                         # Estimate percent (rough calculation)
                         try:
-                            total_memory = psutil.virtual_memory().total
+                            total_memory = system_metrics.virtual_memory().total
                             memory_percent = (process_memory.rss / total_memory) * 100
                         except Exception:
                             memory_percent = 0.0
@@ -231,5 +258,21 @@ async def metrics_publisher() -> None:
         await asyncio.sleep(2)
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    import uvicorn
+
+    # uvloop + httptools come with uvicorn[standard]; "auto" falls back to
+    # asyncio/h11 where they can't be used (e.g. uvloop on Windows). The
+    # reload supervisor is opt-in since it adds a watcher process.
+    # WEB_CONCURRENCY is uvicorn's own worker-count variable, so the CLI in
+    # the Dockerfile honours it too. Each worker is a separate process with
+    # its own caches and Ollama concurrency limit.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        loop="auto",
+        http="auto",
+        reload=os.getenv("API_RELOAD", "false").lower() == "true",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
 
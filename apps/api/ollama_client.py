@@ -7,12 +7,21 @@ import asyncio
 import json
 import logging
 import os
+import time
 from typing import AsyncGenerator, Optional, List
 
 import httpx
 
 logger = logging.getLogger(__name__)
 
+# Default local model; the stock llama3.2 tag is the 3B Q4_K_M build. Point
+# this at another tag (e.g. a q4_0 or larger variant) without code changes.
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
+# Local models serialize (or fall over) under parallel generation; cap in-flight requests
+OLLAMA_MAX_CONCURRENT = int(os.getenv("OLLAMA_MAX_CONCURRENT", "2"))
+# Routes probe availability on every request; reuse the last answer for this long (seconds)
+OLLAMA_HEALTH_TTL = float(os.getenv("OLLAMA_HEALTH_TTL", "5"))
+
 
 class OllamaClient:
     """Client for Ollama API (local LLMs)"""
@@ -24,6 +33,8 @@ class OllamaClient:
         self.base_url = base_url.rstrip("/")
         self._client: Optional[httpx.AsyncClient] = None
         self.timeout = 120.0  # Longer timeout for local models
+        self._generate_slots = asyncio.Semaphore(OLLAMA_MAX_CONCURRENT)
+        self._last_check: tuple[float, bool] = (float("-inf"), False)
 
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create HTTP client"""
@@ -50,23 +61,29 @@ class OllamaClient:
             self._client = None
 
     async def check_available(self) -> bool:
-        """Check if Ollama API is available"""
+        """Check if Ollama API is available (cached for OLLAMA_HEALTH_TTL seconds)"""
+        checked_at, available = self._last_check
+        now = time.monotonic()
+        if now - checked_at < OLLAMA_HEALTH_TTL:
+            return available
         try:
             client = await self._get_client()
             # Try to list models or just ping the API
             response = await client.get(
                 f"{self.base_url}/api/tags",
-                timeout=5.0,
+                timeout=2.0,
             )
-            return response.is_success
+            available = response.is_success
         except Exception as e:
-            logger.debug(f"Ollama check failed: {e}")
-            return False
+            logger.debug("Ollama check failed: %s", e)
+            available = False
+        self._last_check = (now, available)
+        return available
 
     async def stream_chat(
         self,
         messages: List[dict[str, str]],
-        model: str = "llama2",
+        model: str = OLLAMA_MODEL,
         temperature: float = 0.7,
         max_tokens: int = 4096,
     ) -> AsyncGenerator[dict, None]:
@@ -115,7 +132,14 @@ class OllamaClient:
                 },
             }
             
-            async with client.stream(
+            usage_info: Optional[dict] = None
+            error_msg: Optional[str] = None
+            prompt_tokens = 0
+            completion_tokens = 0
+
+            # The final chunk is yielded after leaving this block so the
+            # concurrency slot is released even if the caller stops at "done"
+            async with self._generate_slots, client.stream(
                 "POST",
                 f"{self.base_url}/api/generate",
                 json=request_body,
@@ -130,57 +154,48 @@ class OllamaClient:
                             error_msg = error_json["error"]
                     except:
                         pass
-                    yield {"text": "", "done": True, "error": f"Ollama error: {error_msg}"}
-                    return
-
-                usage_info: Optional[dict] = None
-                prompt_tokens = 0
-                completion_tokens = 0
-                
-                async for chunk in response.aiter_text():
-                    if not chunk.strip():
-                        continue
-                    
-                    lines = chunk.strip().split("\n")
-                    for line in lines:
-                        line = line.strip()
-                        if not line:
+                else:
+                    # aiter_lines reassembles NDJSON records split across network chunks
+                    async for line in response.aiter_lines():
+                        if not line or line.isspace():
                             continue
 
                         try:
                             data = json.loads(line)
-                            
-                            # Extract text delta
-                            if "response" in data:
-                                text = data["response"]
-                                yield {"text": text, "done": False, "error": None}
-                            
-                            # Extract usage info
-                            if "prompt_eval_count" in data:
-                                prompt_tokens = data.get("prompt_eval_count", 0)
-                            if "eval_count" in data:
-                                completion_tokens = data.get("eval_count", 0)
-                            
-                            # Check if done
-                            if data.get("done", False):
-                                usage_info = {
-                                    "prompt_tokens": prompt_tokens,
-                                    "completion_tokens": completion_tokens,
-                                    "total_tokens": prompt_tokens + completion_tokens,
-                                }
-                                yield {"text": "", "done": True, "error": None, "usage": usage_info}
-                                return
                         except json.JSONDecodeError:
                             continue
 
-                # If we exit without done, construct usage from last known values
-                if usage_info is None:
-                    usage_info = {
-                        "prompt_tokens": prompt_tokens,
-                        "completion_tokens": completion_tokens,
-                        "total_tokens": prompt_tokens + completion_tokens,
-                    }
-                yield {"text": "", "done": True, "error": None, "usage": usage_info}
+                        # Extract text delta
+                        if "response" in data:
+                            yield {"text": data["response"], "done": False, "error": None}
+
+                        # Extract usage info
+                        if "prompt_eval_count" in data:
+                            prompt_tokens = data.get("prompt_eval_count", 0)
+                        if "eval_count" in data:
+                            completion_tokens = data.get("eval_count", 0)
+
+                        # Check if done
+                        if data.get("done", False):
+                            usage_info = {
+                                "prompt_tokens": prompt_tokens,
+                                "completion_tokens": completion_tokens,
+                                "total_tokens": prompt_tokens + completion_tokens,
+                            }
+                            break
+
+            if error_msg is not None:
+                yield {"text": "", "done": True, "error": f"Ollama error: {error_msg}"}
+                return
+
+            # If we exit without done, construct usage from last known values
+            if usage_info is None:
+                usage_info = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                }
+            yield {"text": "", "done": True, "error": None, "usage": usage_info}
 
         except httpx.TimeoutException:
             logger.error("Ollama chat request timed out")
@@ -189,6 +204,36 @@ class OllamaClient:
             logger.error(f"Ollama streaming error: {e}")
             yield {"text": "", "done": True, "error": str(e)}
 
+    async def chat(
+        self,
+        messages: List[dict[str, str]],
+        model: str = OLLAMA_MODEL,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+    ) -> dict:
+        """
+        Non-streaming chat completion, collected from stream_chat
+
+        Returns:
+            dict shaped like Ollama's /api/chat reply: 'message' ({'role', 'content'}) and 'usage'
+        """
+        parts: List[str] = []
+        usage: Optional[dict] = None
+        async for chunk in self.stream_chat(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        ):
+            if chunk.get("error"):
+                raise RuntimeError(chunk["error"])
+            if chunk.get("text"):
+                parts.append(chunk["text"])
+            if chunk.get("done"):
+                usage = chunk.get("usage")
+                break
+        return {"message": {"role": "assistant", "content": "".join(parts)}, "usage": usage}
+
 
 # Global singleton instance
 _ollama_client: Optional[OllamaClient] = None
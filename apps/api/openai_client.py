@@ -66,7 +66,7 @@ class OpenAIClient:
             )
             return response.is_success
         except Exception as e:
-            logger.debug(f"OpenAI check failed: {e}")
+            logger.debug("OpenAI check failed: %s", e)
             # If we have an API key, assume it might work (network issues, etc.)
             return bool(self.api_key)
 
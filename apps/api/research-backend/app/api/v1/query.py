@@ -3,7 +3,7 @@ Query Endpoints
 """
 
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 import uuid
 
@@ -16,9 +16,20 @@ router = APIRouter()
 class QueryRequest(BaseModel):
     query: str
     workspace_id: str
-    top_k: Optional[int] = None
+    top_k: int = Field(default=settings.DEFAULT_TOP_K, ge=1)
     mode: Optional[str] = "quick"  # quick, deep
 
+    @field_validator("top_k", mode="before")
+    @classmethod
+    def default_top_k(cls, value):
+        """Treat an explicit null/0 top_k as 'use the default'"""
+        return value or settings.DEFAULT_TOP_K
+
+    @field_validator("top_k")
+    @classmethod
+    def clamp_top_k(cls, value: int) -> int:
+        return min(value, settings.MAX_TOP_K)
+
 
 class QueryResponse(BaseModel):
     query_id: str
@@ -34,7 +45,6 @@ async def submit_query(request: QueryRequest):
     if not request.query.strip():
         raise HTTPException(status_code=400, detail="Query cannot be empty")
     
-    top_k = min(request.top_k or settings.DEFAULT_TOP_K, settings.MAX_TOP_K)
     query_id = str(uuid.uuid4())
     
     # Start query processing (async)
@@ -43,7 +53,7 @@ async def submit_query(request: QueryRequest):
         query_id=query_id,
         query=request.query,
         workspace_id=request.workspace_id,
-        top_k=top_k,
+        top_k=request.top_k,
         mode=request.mode,
     )
     
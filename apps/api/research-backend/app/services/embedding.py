@@ -2,14 +2,31 @@
 Embedding Service
 """
 
+import asyncio
 import hashlib
+from collections import OrderedDict
+import numpy as np
 import redis
 from typing import List, Optional
 import openai
 from app.core.config import settings
 
 # Initialize Redis for caching
-redis_client = redis.from_url(settings.REDIS_URL)
+redis_client = redis.from_url(
+    settings.REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+)
+
+# Process-local LRU in front of Redis for repeated texts (e.g. replayed queries)
+_local_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+
+def _remember(cache_key: str, vector: np.ndarray) -> None:
+    """Store a vector in the local LRU, evicting the oldest entries"""
+    _local_cache[cache_key] = vector
+    _local_cache.move_to_end(cache_key)
+    while len(_local_cache) > settings.EMBEDDING_LOCAL_CACHE_SIZE:
+        _local_cache.popitem(last=False)
 
 
 class EmbeddingService:
@@ -22,7 +39,7 @@ class EmbeddingService:
     def _get_cache_key(self, text: str) -> str:
         """Generate cache key from text hash"""
         text_hash = hashlib.sha256(text.encode()).hexdigest()
-        return f"embedding:{text_hash}"
+        return f"embedding:f32:{text_hash}"
     
     async def get_embeddings(
         self,
@@ -30,61 +47,57 @@ class EmbeddingService:
         use_cache: bool = True,
     ) -> List[List[float]]:
         """Get embeddings for texts, with caching"""
-        embeddings = []
-        texts_to_embed = []
-        text_indices = []
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        cache_keys = [self._get_cache_key(text) for text in texts] if use_cache else []
         
-        # Check cache
-        if use_cache:
-            for idx, text in enumerate(texts):
-                cache_key = self._get_cache_key(text)
-                cached = redis_client.get(cache_key)
+        # Check the local LRU first
+        for idx, cache_key in enumerate(cache_keys):
+            vector = _local_cache.get(cache_key)
+            if vector is not None:
+                _local_cache.move_to_end(cache_key)
+                embeddings[idx] = vector.tolist()
+        
+        # Check Redis for the rest with one MGET instead of a GET per text.
+        # Vectors are cached as packed float32 bytes, a fraction of their
+        # JSON size.
+        redis_indices = [idx for idx in range(len(cache_keys)) if embeddings[idx] is None]
+        if redis_indices:
+            cached_values = await asyncio.to_thread(
+                redis_client.mget, [cache_keys[idx] for idx in redis_indices]
+            )
+            for idx, cached in zip(redis_indices, cached_values):
                 if cached:
-                    import json
-                    embeddings.append(json.loads(cached))
-                else:
-                    texts_to_embed.append(text)
-                    text_indices.append(idx)
-        else:
-            texts_to_embed = texts
-            text_indices = list(range(len(texts)))
+                    vector = np.frombuffer(cached, dtype=np.float32)
+                    _remember(cache_keys[idx], vector)
+                    embeddings[idx] = vector.tolist()
+        
+        text_indices = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
         
         # Get embeddings for uncached texts
-        if texts_to_embed:
-            # Batch API call
-            response = self.client.embeddings.create(
+        if text_indices:
+            # Batch API call, off the event loop so other requests keep moving
+            response = await asyncio.to_thread(
+                self.client.embeddings.create,
                 model=settings.EMBEDDING_MODEL,
-                input=texts_to_embed,
+                input=[texts[idx] for idx in text_indices],
             )
             
             new_embeddings = [item.embedding for item in response.data]
             
-            # Cache new embeddings
+            # Cache new embeddings in a single pipelined round-trip
             if use_cache:
-                for text, embedding in zip(texts_to_embed, new_embeddings):
-                    cache_key = self._get_cache_key(text)
-                    import json
-                    redis_client.setex(
-                        cache_key,
+                pipe = redis_client.pipeline(transaction=False)
+                for idx, embedding in zip(text_indices, new_embeddings):
+                    vector = np.asarray(embedding, dtype=np.float32)
+                    _remember(cache_keys[idx], vector)
+                    pipe.setex(
+                        cache_keys[idx],
                         settings.EMBEDDING_CACHE_TTL,
-                        json.dumps(embedding),
+                        vector.tobytes(),
                     )
+                await asyncio.to_thread(pipe.execute)
             
-            # Merge cached and new embeddings
-            if use_cache:
-                final_embeddings = [None] * len(texts)
-                cached_idx = 0
-                new_idx = 0
-                for i in range(len(texts)):
-                    if i in text_indices:
-                        final_embeddings[i] = new_embeddings[new_idx]
-                        new_idx += 1
-                    else:
-                        final_embeddings[i] = embeddings[cached_idx]
-                        cached_idx += 1
-                embeddings = final_embeddings
-            else:
-                embeddings = new_embeddings
+            for idx, embedding in zip(text_indices, new_embeddings):
+                embeddings[idx] = embedding
         
         return embeddings
-
@@ -8,13 +8,18 @@ from app.services.vector_db import VectorDBService
 from app.services.embedding import EmbeddingService
 from app.services.llm import LLMService
 from app.api.v1.stream import get_stream_queue
-import json
+import orjson
 
 vector_db = VectorDBService()
 embedding_service = EmbeddingService()
 llm_service = LLMService()
 
 
+def _encode(data: Dict[str, Any]) -> str:
+    """Serialize an SSE event payload"""
+    return orjson.dumps(data).decode()
+
+
 class RetrievalService:
     def process_query_async(
         self,
@@ -43,7 +48,7 @@ class RetrievalService:
             # Send retrieval progress
             await queue.put({
                 "event": "retrieval_progress",
-                "data": json.dumps({
+                "data": _encode({
                     "query_id": query_id,
                     "stage": "retrieval",
                     "top_k": top_k,
@@ -64,7 +69,7 @@ class RetrievalService:
             # Send sources ready
             await queue.put({
                 "event": "source_ready",
-                "data": json.dumps({
+                "data": _encode({
                     "query_id": query_id,
                     "sources": chunks,
                 }),
@@ -73,7 +78,7 @@ class RetrievalService:
             # Generate answer with streaming
             await queue.put({
                 "event": "generation_start",
-                "data": json.dumps({
+                "data": _encode({
                     "query_id": query_id,
                     "stage": "generation",
                 }),
@@ -87,7 +92,7 @@ class RetrievalService:
             ):
                 await queue.put({
                     "event": "generation_chunk",
-                    "data": json.dumps({
+                    "data": _encode({
                         "query_id": query_id,
                         "token": token,
                     }),
@@ -96,7 +101,7 @@ class RetrievalService:
             # Send completion
             await queue.put({
                 "event": "complete",
-                "data": json.dumps({
+                "data": _encode({
                     "query_id": query_id,
                     "status": "completed",
                 }),
@@ -108,7 +113,7 @@ class RetrievalService:
         except Exception as e:
             await queue.put({
                 "event": "error",
-                "data": json.dumps({
+                "data": _encode({
                     "query_id": query_id,
                     "error": str(e),
                 }),
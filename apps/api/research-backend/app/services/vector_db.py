@@ -2,27 +2,63 @@
 Vector DB Service (Qdrant)
 """
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import (
+    Distance,
+    VectorParams,
+    PointStruct,
+    PayloadSchemaType,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    Filter,
+    FieldCondition,
+    MatchValue,
+)
 from typing import List, Dict, Any, Optional
+import functools
 import uuid
 
 from app.core.config import settings
 
+# Payload keys used in search filters; indexed so Qdrant can filter inside
+# the HNSW search instead of scanning payloads
+INDEXED_PAYLOAD_FIELDS = ("workspace_id", "doc_id")
+
+# Payload keys returned from search; skips fields the results don't use
+SEARCH_PAYLOAD_FIELDS = ["chunk_id", "doc_id", "text", "page", "source_url"]
+
+
+# typed: 1, 1.0 and True compare equal but must not share one cached MatchValue
+@functools.lru_cache(maxsize=1024, typed=True)
+def _match_condition(key: str, value: Any) -> FieldCondition:
+    """Exact-match condition, reused across searches (e.g. per workspace)"""
+    return FieldCondition(key=key, match=MatchValue(value=value))
+
 
 class VectorDBService:
     def __init__(self):
         self.client = QdrantClient(
             url=settings.QDRANT_URL,
             api_key=settings.QDRANT_API_KEY,
+            prefer_grpc=settings.QDRANT_PREFER_GRPC,
+            grpc_port=settings.QDRANT_GRPC_PORT,
+        )
+        # Searches run on the API event loop, so they get a native async client
+        self.async_client = AsyncQdrantClient(
+            url=settings.QDRANT_URL,
+            api_key=settings.QDRANT_API_KEY,
+            prefer_grpc=settings.QDRANT_PREFER_GRPC,
+            grpc_port=settings.QDRANT_GRPC_PORT,
         )
         self.collection = settings.QDRANT_COLLECTION
         self._ensure_collection()
     
     def _ensure_collection(self):
-        """Create collection if it doesn't exist"""
+        """Create collection and payload indexes if they don't exist"""
         try:
-            self.client.get_collection(self.collection)
+            info = self.client.get_collection(self.collection)
+            indexed = set(info.payload_schema or {})
         except Exception:
             # Collection doesn't exist, create it
             self.client.create_collection(
@@ -31,7 +67,25 @@ class VectorDBService:
                     size=1536,  # OpenAI embedding size
                     distance=Distance.COSINE,
                 ),
+                # Keep int8 copies of the vectors in RAM for HNSW traversal
+                # (4x smaller than float32); originals are kept for rescoring
+                quantization_config=ScalarQuantization(
+                    scalar=ScalarQuantizationConfig(
+                        type=ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True,
+                    ),
+                ),
             )
+            indexed = set()
+        
+        for field_name in INDEXED_PAYLOAD_FIELDS:
+            if field_name not in indexed:
+                self.client.create_payload_index(
+                    collection_name=self.collection,
+                    field_name=field_name,
+                    field_schema=PayloadSchemaType.KEYWORD,
+                )
     
     async def upsert_chunks(
         self,
@@ -39,27 +93,33 @@ class VectorDBService:
         embeddings: List[List[float]],
     ):
         """Upsert chunks with embeddings to vector DB"""
-        points = []
-        for chunk, embedding in zip(chunks, embeddings):
-            points.append(
-                PointStruct(
-                    id=str(uuid.uuid4()),
-                    vector=embedding,
-                    payload={
-                        "doc_id": chunk["doc_id"],
-                        "chunk_id": chunk["chunk_id"],
-                        "text": chunk["text"][:1000],  # Truncate for payload
-                        "workspace_id": chunk.get("workspace_id"),
-                        "page": chunk.get("page"),
-                        "source_url": chunk.get("source_url"),
-                    },
-                )
+        points = [
+            PointStruct(
+                id=str(uuid.uuid4()),
+                vector=embedding,
+                payload={
+                    "doc_id": chunk["doc_id"],
+                    "chunk_id": chunk["chunk_id"],
+                    "text": chunk["text"][:1000],  # Truncate for payload
+                    "workspace_id": chunk.get("workspace_id"),
+                    "page": chunk.get("page"),
+                    "source_url": chunk.get("source_url"),
+                },
             )
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
         
-        self.client.upsert(
-            collection_name=self.collection,
-            points=points,
-        )
+        # Send fixed-size batches without waiting for each one to be applied;
+        # Qdrant applies updates in order, so waiting on the last batch means
+        # the whole document is indexed when this returns
+        batch_size = settings.QDRANT_UPSERT_BATCH_SIZE
+        for start in range(0, len(points), batch_size):
+            end = start + batch_size
+            self.client.upsert(
+                collection_name=self.collection,
+                points=points[start:end],
+                wait=end >= len(points),
+            )
     
     async def search(
         self,
@@ -70,28 +130,25 @@ class VectorDBService:
     ) -> List[Dict[str, Any]]:
         """Search for similar chunks"""
         # Build filter
-        filter_conditions = {}
-        if workspace_id:
-            filter_conditions["workspace_id"] = workspace_id
-        if filter_dict:
-            filter_conditions.update(filter_dict)
-        
-        from qdrant_client.models import Filter, FieldCondition, MatchValue
-        
-        search_filter = None
-        if filter_conditions:
+        if not (workspace_id or filter_dict):
+            search_filter = None
+        else:
+            filter_conditions = {"workspace_id": workspace_id} if workspace_id else {}
+            if filter_dict:
+                filter_conditions.update(filter_dict)
             search_filter = Filter(
                 must=[
-                    FieldCondition(key=key, match=MatchValue(value=value))
+                    _match_condition(key, value)
                     for key, value in filter_conditions.items()
                 ]
             )
         
-        results = self.client.search(
+        results = await self.async_client.search(
             collection_name=self.collection,
             query_vector=query_embedding,
             limit=top_k,
             query_filter=search_filter,
+            with_payload=SEARCH_PAYLOAD_FIELDS,
         )
         
         return [
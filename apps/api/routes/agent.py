@@ -14,7 +14,7 @@ from pydantic import BaseModel
 
 from apps.api.security import get_current_user
 from apps.api.models import User
-from apps.api.ollama_client import get_ollama_client
+from apps.api.ollama_client import OLLAMA_MODEL, get_ollama_client
 from apps.api.cache import cache_get, cache_set
 
 logger = logging.getLogger(__name__)
@@ -278,7 +278,7 @@ async def _simulate_run(run_id: str, queue: asyncio.Queue, goal: str, cache_key:
                 # Try Ollama with retry logic
                 async for chunk in ollama.stream_chat(
                     messages=messages,
-                    model="llama3.2",
+                    model=OLLAMA_MODEL,
                     temperature=0.7,
                     max_tokens=2048,
                 ):
@@ -22,7 +22,7 @@ router = APIRouter()
 
 
 @router.get("/ai/metrics/summary")
-async def get_metrics_summary(
+def get_metrics_summary(
     hours: int = Query(24, ge=1, le=168, description="Time window in hours"),
     kind: Optional[str] = Query(None, description="Filter by task kind"),
     mode: Optional[str] = Query(None, description="Filter by mode"),
@@ -127,7 +127,7 @@ async def get_metrics_summary(
 
 
 @router.get("/ai/metrics/timeline")
-async def get_metrics_timeline(
+def get_metrics_timeline(
     hours: int = Query(24, ge=1, le=168),
     interval_minutes: int = Query(60, ge=5, le=1440, description="Bucket size in minutes"),
     kind: Optional[str] = Query(None),
@@ -184,7 +184,7 @@ async def get_metrics_timeline(
 
 
 @router.get("/ai/metrics/top-errors")
-async def get_top_errors(
+def get_top_errors(
     hours: int = Query(24, ge=1, le=168),
     limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db),
@@ -3,7 +3,6 @@ AI-Powered Search Endpoint
 Provides search with AI summarization and enhanced ranking
 """
 
-import asyncio
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
@@ -11,7 +10,12 @@ from typing import List, Optional
 import json
 import logging
 
-from apps.api.services.search_aggregator import aggregate_search
+from apps.api.services.search_aggregator import (
+    results_to_dicts,
+    search_ranked_results,
+    summarize_search_results,
+    summarize_search_results_stream,
+)
 from apps.api.openai_client import get_openai_client
 from apps.api.huggingface_client import get_huggingface_client
 from apps.api.ollama_client import get_ollama_client
@@ -40,23 +44,16 @@ async def ai_search(request: AISearchRequest):
         import os
         bing_api_key = os.getenv('BING_API_KEY')
         
+        summary_length = request.summary_length or 200
+        
         # Perform search
-        search_response = await aggregate_search(
+        ranked_results = await search_ranked_results(
             query=request.query,
             sources=request.sources or ['duckduckgo', 'bing'],
             max_results=request.max_results or 20,
             bing_api_key=bing_api_key,
-            include_summary=request.include_summary,
-            summary_length=request.summary_length or 200,
         )
-        
-        # Handle response format
-        if isinstance(search_response, dict):
-            results = search_response.get('results', [])
-            summary = search_response.get('summary', '')
-        else:
-            results = search_response
-            summary = ''
+        results = results_to_dicts(ranked_results)
         
         if request.stream:
             # Streaming response
@@ -64,13 +61,11 @@ async def ai_search(request: AISearchRequest):
                 # Send results first
                 yield f"data: {json.dumps({'type': 'results', 'results': results[:10]})}\n\n"
                 
-                # Generate and stream summary if requested
-                if request.include_summary and summary:
+                # Generate and stream summary if requested, forwarding tokens as the model emits them
+                if request.include_summary and results:
                     yield f"data: {json.dumps({'type': 'summary_start'})}\n\n"
-                    # Stream summary character by character for effect
-                    for char in summary:
-                        yield f"data: {json.dumps({'type': 'summary_token', 'text': char})}\n\n"
-                        await asyncio.sleep(0.01)
+                    async for text in summarize_search_results_stream(request.query, ranked_results, summary_length):
+                        yield f"data: {json.dumps({'type': 'summary_token', 'text': text})}\n\n"
                     yield f"data: {json.dumps({'type': 'summary_done'})}\n\n"
                 
                 yield f"data: {json.dumps({'type': 'done', 'total_results': len(results), 'done': True})}\n\n"
@@ -78,6 +73,9 @@ async def ai_search(request: AISearchRequest):
             return StreamingResponse(generate(), media_type="text/event-stream")
         else:
             # Non-streaming response
+            summary = ''
+            if request.include_summary:
+                summary = await summarize_search_results(request.query, ranked_results, summary_length)
             return {
                 'results': results,
                 'summary': summary,
@@ -399,7 +399,7 @@ async def run_ai_task(request_body: AITaskRequest, request: Request):
                 # If retryable and we have attempts left, retry with exponential backoff
                 if retryable and attempt < max_attempts:
                     delay = min(base_delay * (2 ** (attempt - 1)), 5.0)  # Max 5 seconds
-                    logger.debug(f"Retrying in {delay:.2f}s... (attempt {attempt}/{max_attempts})")
+                    logger.debug("Retrying in %.2fs... (attempt %s/%s)", delay, attempt, max_attempts)
                     await asyncio.sleep(delay)
                     continue
                 
@@ -42,7 +42,7 @@ class RefreshRequest(BaseModel):
 
 
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
-async def signup(request: SignupRequest, db: Session = Depends(get_db)):
+def signup(request: SignupRequest, db: Session = Depends(get_db)):
     """User registration"""
     existing = db.query(User).filter(User.email == request.email.lower()).first()
     if existing:
@@ -61,7 +61,7 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+def login(request: LoginRequest, db: Session = Depends(get_db)):
     """Email/password login"""
     user = authenticate_user(db, request.email, request.password)
     if not user:
@@ -89,7 +89,7 @@ async def login_otp(phone: str):
     raise HTTPException(status_code=501, detail="OTP not implemented yet")
 
 @router.post("/token/refresh")
-async def refresh_token(request: RefreshRequest, db: Session = Depends(get_db)):
+def refresh_token(request: RefreshRequest, db: Session = Depends(get_db)):
     """Refresh access token"""
     token_payload = decode_token(request.refresh_token)
     user = db.query(User).filter(User.id == token_payload.sub).first()
@@ -4,8 +4,8 @@ Eco score calculation endpoint
 
 from fastapi import APIRouter
 from pydantic import BaseModel
-import psutil
 import logging
+from apps.api.services import system_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +30,8 @@ async def get_eco_score():
     """
     try:
         # Get system metrics
-        cpu_percent = psutil.cpu_percent(interval=0.1) or 0.0
-        memory_percent = psutil.virtual_memory().percent or 0.0
+        cpu_percent = system_metrics.cpu_percent()
+        memory_percent = system_metrics.virtual_memory().percent or 0.0
         
         # Mock session tokens (in real implementation, track from Redix)
         # This would come from a session store or metrics
@@ -4,6 +4,7 @@ Page content extraction endpoint for Reader/Notes sidebar
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from typing import Optional
 import httpx
 import logging
 
@@ -11,6 +12,24 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Regen/1.0"
+
+# Shared across requests so page fetches reuse pooled keep-alive connections
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client for page fetches"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        )
+    return _http_client
+
 
 class ExtractRequest(BaseModel):
     url: str
@@ -32,17 +51,10 @@ async def extract_content(request: ExtractRequest):
     """
     try:
         # Fetch the page
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                request.url,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Regen/1.0"
-                },
-                follow_redirects=True,
-            )
-            response.raise_for_status()
-            html = response.text
-            final_url = str(response.url)
+        response = await _get_http_client().get(request.url)
+        response.raise_for_status()
+        html = response.text
+        final_url = str(response.url)
 
         # Extract readable content using Readability
         try:
@@ -3,15 +3,16 @@ LLM Assistant API - Unified endpoint for AI assistant features
 Supports page content extraction, "Ask about this page", and summarization
 """
 
-import asyncio
+import hashlib
 import logging
+import os
 from typing import Optional
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import json
 
-from apps.api.ollama_client import get_ollama_client
+from apps.api.ollama_client import OLLAMA_MODEL, get_ollama_client
 from apps.api.huggingface_client import get_huggingface_client
 from apps.api.openai_client import get_openai_client
 from apps.api.routes.extract import extract_content, ExtractRequest
@@ -21,6 +22,55 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Static prompt text, built once at import rather than on every request.
+# Fixed instructions live in the system prompt and per-request data is
+# appended after it, least volatile first (page, then question), so the
+# leading tokens stay byte-identical and providers can reuse their prefix cache.
+ASK_ABOUT_PAGE_SYSTEM_PROMPT = """You are Redix, an AI assistant for Regen. 
+You help users understand web pages by answering questions about their content.
+Provide accurate, concise answers based on the page content provided.
+Answer the user's question from the page content. If the answer cannot be found in the content, say so."""
+
+SUMMARIZE_SYSTEM_PROMPT = """You are Redix, an AI assistant for Regen.
+You create clear, accurate summaries of web pages."""
+
+DEFAULT_ASSISTANT_SYSTEM_PROMPT = "You are Redix, an AI assistant for Regen. Provide helpful, concise answers."
+
+SUMMARY_STYLE_INSTRUCTIONS = {
+    "concise": "Provide a brief 2-3 sentence summary.",
+    "detailed": "Provide a comprehensive summary covering all key points.",
+    "bullet": "Provide a bullet-point summary of the main points.",
+}
+
+# Page content budgets (chars) for the prompt
+ASK_CONTENT_MAX_CHARS = 5000
+SUMMARY_CONTENT_MAX_CHARS = 8000
+
+# Finished summaries and non-streamed assistant answers are cached in Redis
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "3600"))
+
+
+def _cache_key(kind: str, *parts: object) -> str:
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f"llm:{kind}:{digest}"
+
+
+async def _replay_cached(text: str, message: str):
+    """Serve a cached answer through the same SSE event sequence as a live one"""
+    yield f"data: {json.dumps({'type': 'start', 'message': message})}\n\n"
+    yield f"data: {json.dumps({'type': 'token', 'text': text})}\n\n"
+    yield f"data: {json.dumps({'type': 'done', 'done': True})}\n\n"
+
+
+def _trim_content(text: str, max_chars: int) -> str:
+    """Trim text to a budget at a word boundary, marking the cut"""
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    if cut < max_chars // 2:
+        cut = max_chars
+    return text[:cut].rstrip() + " […]"
+
 
 class AskAboutPageRequest(BaseModel):
     """Request for 'Ask about this page' feature"""
@@ -58,21 +108,16 @@ async def ask_about_page(request: AskAboutPageRequest):
         if not page_context:
             extract_req = ExtractRequest(url=request.url)
             extracted = await extract_content(extract_req)
-            page_context = f"Title: {extracted.title}\n\nContent: {extracted.content[:5000]}"  # Limit to 5000 chars
+            page_context = f"Title: {extracted.title}\n\nContent: {_trim_content(extracted.content, ASK_CONTENT_MAX_CHARS)}"
         
         # Build prompt with context
-        system_prompt = """You are Redix, an AI assistant for Regen. 
-You help users understand web pages by answering questions about their content.
-Provide accurate, concise answers based on the page content provided."""
-        
+        system_prompt = ASK_ABOUT_PAGE_SYSTEM_PROMPT
         user_prompt = f"""Page URL: {request.url}
 
 Page Content:
 {page_context}
 
-User Question: {request.prompt}
-
-Please answer the user's question based on the page content above. If the answer cannot be found in the content, say so."""
+User Question: {request.prompt}"""
         
         # Get AI client
         openai = get_openai_client()
@@ -123,17 +168,16 @@ Please answer the user's question based on the page content above. If the answer
                     if chunk.get("done"):
                         break
             else:
-                response = await ollama.chat(
+                async for chunk in ollama.stream_chat(
                     messages=messages,
-                    model="llama3.2",
+                    model=OLLAMA_MODEL,
                     temperature=0.7,
                     max_tokens=1024,
-                )
-                answer = response.get("message", {}).get("content", "")
-                # Stream the answer character by character for consistency
-                for char in answer:
-                    yield f"data: {json.dumps({'type': 'token', 'text': char})}\n\n"
-                    await asyncio.sleep(0.01)
+                ):
+                    if chunk.get("text"):
+                        yield f"data: {json.dumps({'type': 'token', 'text': chunk['text']})}\n\n"
+                    if chunk.get("done"):
+                        break
             
             yield f"data: {json.dumps({'type': 'done', 'done': True})}\n\n"
         
@@ -153,26 +197,24 @@ async def summarize_page(request: SummarizePageRequest):
     Extracts content and generates a summary.
     """
     try:
+        # A cached summary skips both the page fetch and the LLM call
+        cache_key = _cache_key("summary", request.url, request.style, request.max_length)
+        cached = await cache_get(cache_key)
+        if cached:
+            return StreamingResponse(_replay_cached(cached, "Summarizing page..."), media_type="text/event-stream")
+        
         # Extract page content
         extract_req = ExtractRequest(url=request.url)
         extracted = await extract_content(extract_req)
         
         # Build summarization prompt
-        style_instructions = {
-            "concise": "Provide a brief 2-3 sentence summary.",
-            "detailed": "Provide a comprehensive summary covering all key points.",
-            "bullet": "Provide a bullet-point summary of the main points.",
-        }
-        style_instruction = style_instructions.get(request.style, style_instructions["concise"])
-        
-        system_prompt = """You are Redix, an AI assistant for Regen.
-You create clear, accurate summaries of web pages."""
-        
+        style_instruction = SUMMARY_STYLE_INSTRUCTIONS.get(request.style, SUMMARY_STYLE_INSTRUCTIONS["concise"])
+        system_prompt = SUMMARIZE_SYSTEM_PROMPT
         user_prompt = f"""Page URL: {request.url}
 Page Title: {extracted.title}
 
 Page Content:
-{extracted.content[:8000]}  # Limit to 8000 chars for summarization
+{_trim_content(extracted.content, SUMMARY_CONTENT_MAX_CHARS)}
 
 {style_instruction}
 Maximum length: {request.max_length} words."""
@@ -200,6 +242,8 @@ Maximum length: {request.max_length} words."""
                 {"role": "user", "content": user_prompt},
             ]
             
+            parts: list[str] = []
+            errored = False
             yield f"data: {json.dumps({'type': 'start', 'message': 'Summarizing page...'})}\n\n"
             
             # Prefer OpenAI, then Hugging Face, then Ollama
@@ -210,7 +254,12 @@ Maximum length: {request.max_length} words."""
                     temperature=0.5,
                     max_tokens=512,
                 ):
+                    if chunk.get("error"):
+                        errored = True
+                        yield f"data: {json.dumps({'type': 'error', 'text': chunk['error'], 'done': True})}\n\n"
+                        break
                     if chunk.get("text"):
+                        parts.append(chunk["text"])
                         yield f"data: {json.dumps({'type': 'token', 'text': chunk['text']})}\n\n"
                     if chunk.get("done"):
                         break
@@ -221,21 +270,35 @@ Maximum length: {request.max_length} words."""
                     temperature=0.5,
                     max_tokens=512,
                 ):
+                    if chunk.get("error"):
+                        errored = True
+                        yield f"data: {json.dumps({'type': 'error', 'text': chunk['error'], 'done': True})}\n\n"
+                        break
                     if chunk.get("text"):
+                        parts.append(chunk["text"])
                         yield f"data: {json.dumps({'type': 'token', 'text': chunk['text']})}\n\n"
                     if chunk.get("done"):
                         break
             else:
-                response = await ollama.chat(
+                async for chunk in ollama.stream_chat(
                     messages=messages,
-                    model="llama3.2",
+                    model=OLLAMA_MODEL,
                     temperature=0.5,
                     max_tokens=512,
-                )
-                answer = response.get("message", {}).get("content", "")
-                for char in answer:
-                    yield f"data: {json.dumps({'type': 'token', 'text': char})}\n\n"
-                    await asyncio.sleep(0.01)
+                ):
+                    if chunk.get("error"):
+                        errored = True
+                        yield f"data: {json.dumps({'type': 'error', 'text': chunk['error'], 'done': True})}\n\n"
+                        break
+                    if chunk.get("text"):
+                        parts.append(chunk["text"])
+                        yield f"data: {json.dumps({'type': 'token', 'text': chunk['text']})}\n\n"
+                    if chunk.get("done"):
+                        break
+            
+            # A summary cut short by a backend error is not worth replaying
+            if parts and not errored:
+                await cache_set(cache_key, "".join(parts), ttl_seconds=LLM_CACHE_TTL)
             
             yield f"data: {json.dumps({'type': 'done', 'done': True})}\n\n"
         
@@ -255,7 +318,7 @@ async def llm_assistant(request: LLMAssistantRequest):
     Can be used for any AI assistant task with optional context.
     """
     try:
-        system_prompt = request.system_prompt or "You are Redix, an AI assistant for Regen. Provide helpful, concise answers."
+        system_prompt = request.system_prompt or DEFAULT_ASSISTANT_SYSTEM_PROMPT
         
         user_prompt = request.prompt
         if request.context:
@@ -279,6 +342,11 @@ async def llm_assistant(request: LLMAssistantRequest):
         
         if not request.stream:
             # Non-streaming response
+            cache_key = _cache_key("assistant", system_prompt, user_prompt, request.temperature, request.max_tokens)
+            cached = await cache_get(cache_key)
+            if cached:
+                return json.loads(cached)
+            
             messages = [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
@@ -292,11 +360,14 @@ async def llm_assistant(request: LLMAssistantRequest):
                     temperature=request.temperature,
                     max_tokens=request.max_tokens,
                 ):
+                    if chunk.get("error"):
+                        # Don't hand back (or cache) a half-finished answer
+                        raise HTTPException(status_code=502, detail=f"AI generation failed: {chunk['error']}")
                     if chunk.get("text"):
                         response_text += chunk["text"]
                     if chunk.get("done"):
                         break
-                return {"response": response_text, "model": "gpt-4o-mini"}
+                result = {"response": response_text, "model": "gpt-4o-mini"}
             elif hf_available:
                 response_text = ""
                 async for chunk in hf.stream_chat(
@@ -305,20 +376,26 @@ async def llm_assistant(request: LLMAssistantRequest):
                     temperature=request.temperature,
                     max_tokens=request.max_tokens,
                 ):
+                    if chunk.get("error"):
+                        raise HTTPException(status_code=502, detail=f"AI generation failed: {chunk['error']}")
                     if chunk.get("text"):
                         response_text += chunk["text"]
                     if chunk.get("done"):
                         break
-                return {"response": response_text, "model": "meta-llama/Meta-Llama-3-8B-Instruct"}
+                result = {"response": response_text, "model": "meta-llama/Meta-Llama-3-8B-Instruct"}
             else:
                 response = await ollama.chat(
                     messages=messages,
-                    model="llama3.2",
+                    model=OLLAMA_MODEL,
                     temperature=request.temperature,
                     max_tokens=request.max_tokens,
                 )
                 answer = response.get("message", {}).get("content", "")
-                return {"response": answer, "model": "llama3.2"}
+                result = {"response": answer, "model": OLLAMA_MODEL}
+            
+            if result["response"]:
+                await cache_set(cache_key, result, ttl_seconds=LLM_CACHE_TTL)
+            return result
         
         # Streaming response
         async def generate():
@@ -352,16 +429,16 @@ async def llm_assistant(request: LLMAssistantRequest):
                     if chunk.get("done"):
                         break
             else:
-                response = await ollama.chat(
+                async for chunk in ollama.stream_chat(
                     messages=messages,
-                    model="llama3.2",
+                    model=OLLAMA_MODEL,
                     temperature=request.temperature,
                     max_tokens=request.max_tokens,
-                )
-                answer = response.get("message", {}).get("content", "")
-                for char in answer:
-                    yield f"data: {json.dumps({'type': 'token', 'text': char})}\n\n"
-                    await asyncio.sleep(0.01)
+                ):
+                    if chunk.get("text"):
+                        yield f"data: {json.dumps({'type': 'token', 'text': chunk['text']})}\n\n"
+                    if chunk.get("done"):
+                        break
             
             yield f"data: {json.dumps({'type': 'done', 'done': True})}\n\n"
         
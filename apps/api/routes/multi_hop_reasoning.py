@@ -12,7 +12,7 @@ from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from apps.api.ollama_client import get_ollama_client
+from apps.api.ollama_client import OLLAMA_MODEL, get_ollama_client
 from apps.api.huggingface_client import get_huggingface_client
 from apps.api.openai_client import get_openai_client
 from apps.api.cache import cache_get, cache_set
@@ -59,7 +59,7 @@ async def search_web(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
         # Results are already ranked and deduplicated by aggregate_search
         return results
     except Exception as e:
-        logger.debug(f"Web search failed: {e}")
+        logger.debug("Web search failed: %s", e)
         # Fallback to basic DuckDuckGo search
         try:
             import aiohttp
@@ -81,7 +81,7 @@ async def search_web(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
                             })
                         return results
         except Exception as e2:
-            logger.debug(f"Fallback search failed: {e2}")
+            logger.debug("Fallback search failed: %s", e2)
     
     return []
 
@@ -133,7 +133,7 @@ Return only valid JSON, no markdown or explanation."""
             text = response_text
         else:
             # Ollama client
-            response = await ai_client.chat(messages=messages, model="llama3.2", temperature=0.3)
+            response = await ai_client.chat(messages=messages, model=OLLAMA_MODEL, temperature=0.3)
             text = response.get("message", {}).get("content", "")
         
         # Extract JSON from response
@@ -194,7 +194,7 @@ Provide a clear, well-structured answer that synthesizes information from all st
             return answer_text or "Unable to synthesize answer."
         else:
             # Ollama
-            response = await ai_client.chat(messages=messages, model="llama3.2", temperature=0.5)
+            response = await ai_client.chat(messages=messages, model=OLLAMA_MODEL, temperature=0.5)
             return response.get("message", {}).get("content", "Unable to synthesize answer.")
     except Exception as e:
         logger.warn(f"Answer synthesis failed: {e}")
@@ -269,7 +269,7 @@ Provide a clear, concise answer."""
                 ]
                 
                 # Use AI client for streaming
-                model = "gpt-4o-mini" if is_openai else ("meta-llama/Meta-Llama-3-8B-Instruct" if is_hf else "llama3.2")
+                model = "gpt-4o-mini" if is_openai else ("meta-llama/Meta-Llama-3-8B-Instruct" if is_hf else OLLAMA_MODEL)
                 async for chunk in ai_client.stream_chat(messages=messages, model=model, temperature=0.5):
                     if chunk.get("error"):
                         yield f"data: {json.dumps({'type': 'error', 'text': chunk['error'], 'done': True})}\n\n"
@@ -322,7 +322,7 @@ Provide a clear, concise answer."""
                             step.answer = answer_text
                         else:
                             # Ollama
-                            response = await ai_client.chat(messages=messages, model="llama3.2", temperature=0.3)
+                            response = await ai_client.chat(messages=messages, model=OLLAMA_MODEL, temperature=0.3)
                             step.answer = response.get("message", {}).get("content", "")
                     
                     yield f"data: {json.dumps({'type': 'hop_result', 'hop': i+1, 'answer': step.answer or 'No answer found', 'sources': step.sources})}\n\n"
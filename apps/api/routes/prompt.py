@@ -4,16 +4,32 @@ Prompt agent endpoint - "Ask about this page" feature
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
+import asyncio
+import hashlib
+import json
 import logging
+import os
+from apps.api.cache import cache_get, cache_set
 from apps.api.openai_client import get_openai_client
 from apps.api.huggingface_client import get_huggingface_client
-from apps.api.ollama_client import get_ollama_client
+from apps.api.ollama_client import OLLAMA_MODEL, get_ollama_client
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+SYSTEM_PROMPT = "You are Redix, an AI assistant for Regen. Provide helpful, concise answers."
+# Placeholder for an empty completion; never cached so the next request retries
+NO_RESPONSE = "No response generated."
+
+# Answers are reused for identical (normalized) prompt/context/url triples
+PROMPT_CACHE_TTL = int(os.getenv("PROMPT_CACHE_TTL", "3600"))
+
+# Answers currently being generated, by cache key; identical concurrent
+# requests await the same task instead of each calling a backend
+_inflight: Dict[str, "asyncio.Task[PromptResponse]"] = {}
+
 
 class PromptRequest(BaseModel):
     prompt: str
@@ -26,87 +42,128 @@ class PromptResponse(BaseModel):
     model: str
 
 
+def _normalize(text: Optional[str]) -> str:
+    """Collapse whitespace and case so trivially different prompts share a key"""
+    return " ".join((text or "").split()).lower()
+
+
+def _prompt_cache_key(request: PromptRequest) -> str:
+    key_str = "|".join(
+        [_normalize(request.prompt), _normalize(request.context), (request.url or "").strip()]
+    )
+    return f"prompt:answer:{hashlib.sha256(key_str.encode('utf-8')).hexdigest()}"
+
+
 @router.post("/prompt", response_model=PromptResponse)
 async def prompt_agent(request: PromptRequest):
     """
     Process a prompt with optional page context.
     Used for "Ask about this page" feature.
     """
+    cache_key = _prompt_cache_key(request)
+    cached = await cache_get(cache_key)
+    if cached:
+        try:
+            return PromptResponse(**json.loads(cached))
+        except (ValueError, TypeError):
+            pass
+
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(_answer_and_cache(request, cache_key))
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+
     try:
-        # Build context-aware prompt
-        system_prompt = "You are Redix, an AI assistant for Regen. Provide helpful, concise answers."
-        
-        user_prompt = request.prompt
-        if request.context:
-            user_prompt = f"Context from page:\n{request.context}\n\nUser question: {request.prompt}"
-        if request.url:
-            user_prompt = f"Page URL: {request.url}\n\n{user_prompt}"
-        
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-        
-        # Try AI backends in priority order
-        openai = get_openai_client()
-        openai_available = await openai.check_available()
-        
-        if openai_available:
-            # Use OpenAI
-            response_text = ""
-            async for chunk in openai.stream_chat(
-                messages=messages,
-                model="gpt-4o-mini",
-                temperature=0.7,
-                max_tokens=1024,
-            ):
-                if chunk.get("text"):
-                    response_text += chunk["text"]
-                if chunk.get("done"):
-                    break
-            return PromptResponse(answer=response_text or "No response generated.", model="gpt-4o-mini")
-        
-        # Try Hugging Face
-        hf = get_huggingface_client()
-        hf_available = await hf.check_available()
-        
-        if hf_available:
-            response_text = ""
-            async for chunk in hf.stream_chat(
-                messages=messages,
-                model="meta-llama/Meta-Llama-3-8B-Instruct",
-                temperature=0.7,
-                max_tokens=1024,
-            ):
-                if chunk.get("text"):
-                    response_text += chunk["text"]
-                if chunk.get("done"):
-                    break
-            return PromptResponse(answer=response_text or "No response generated.", model="meta-llama/Meta-Llama-3-8B-Instruct")
-        
-        # Try Ollama
-        ollama = get_ollama_client()
-        ollama_available = await ollama.check_available()
-        
-        if ollama_available:
-            response = await ollama.chat(
-                messages=messages,
-                model="llama3.2",
-                temperature=0.7,
-                max_tokens=1024,
-            )
-            answer = response.get("message", {}).get("content", "No response generated.")
-            return PromptResponse(answer=answer, model="llama3.2")
-        
-        # No AI backend available
-        raise HTTPException(
-            status_code=503,
-            detail="AI services unavailable. Please check your OpenAI, Hugging Face API key, or start Ollama."
-        )
-        
+        # Shielded so one client disconnecting doesn't cancel the answer for the others
+        return await asyncio.shield(task)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Prompt agent error: {e}")
         raise HTTPException(status_code=500, detail=f"Prompt processing failed: {str(e)}")
 
+
+async def _answer_and_cache(request: PromptRequest, cache_key: str) -> PromptResponse:
+    response = await _answer_prompt(request)
+    if response.answer and response.answer != NO_RESPONSE:
+        await cache_set(cache_key, response.model_dump(), ttl_seconds=PROMPT_CACHE_TTL)
+    return response
+
+
+async def _answer_prompt(request: PromptRequest) -> PromptResponse:
+    """Run the prompt against the first available AI backend"""
+    # Build context-aware prompt
+    system_prompt = SYSTEM_PROMPT
+    
+    user_prompt = request.prompt
+    if request.context:
+        user_prompt = f"Context from page:\n{request.context}\n\nUser question: {request.prompt}"
+    if request.url:
+        user_prompt = f"Page URL: {request.url}\n\n{user_prompt}"
+    
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+    
+    # Try AI backends in priority order
+    openai = get_openai_client()
+    openai_available = await openai.check_available()
+    
+    if openai_available:
+        # Use OpenAI
+        response_text = ""
+        async for chunk in openai.stream_chat(
+            messages=messages,
+            model="gpt-4o-mini",
+            temperature=0.7,
+            max_tokens=1024,
+        ):
+            if chunk.get("error"):
+                raise RuntimeError(chunk["error"])
+            if chunk.get("text"):
+                response_text += chunk["text"]
+            if chunk.get("done"):
+                break
+        return PromptResponse(answer=response_text or NO_RESPONSE, model="gpt-4o-mini")
+    
+    # Try Hugging Face
+    hf = get_huggingface_client()
+    hf_available = await hf.check_available()
+    
+    if hf_available:
+        response_text = ""
+        async for chunk in hf.stream_chat(
+            messages=messages,
+            model="meta-llama/Meta-Llama-3-8B-Instruct",
+            temperature=0.7,
+            max_tokens=1024,
+        ):
+            if chunk.get("error"):
+                raise RuntimeError(chunk["error"])
+            if chunk.get("text"):
+                response_text += chunk["text"]
+            if chunk.get("done"):
+                break
+        return PromptResponse(answer=response_text or NO_RESPONSE, model="meta-llama/Meta-Llama-3-8B-Instruct")
+    
+    # Try Ollama
+    ollama = get_ollama_client()
+    ollama_available = await ollama.check_available()
+    
+    if ollama_available:
+        response = await ollama.chat(
+            messages=messages,
+            model=OLLAMA_MODEL,
+            temperature=0.7,
+            max_tokens=1024,
+        )
+        answer = response.get("message", {}).get("content") or NO_RESPONSE
+        return PromptResponse(answer=answer, model=OLLAMA_MODEL)
+    
+    # No AI backend available
+    raise HTTPException(
+        status_code=503,
+        detail="AI services unavailable. Please check your OpenAI, Hugging Face API key, or start Ollama."
+    )
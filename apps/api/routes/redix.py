@@ -6,6 +6,7 @@ import asyncio
 import hashlib
 import json
 import logging
+import os
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Depends
@@ -27,7 +28,7 @@ except (ImportError, AttributeError):
         return MockUser()
     User = MockUser
 
-from apps.api.ollama_client import get_ollama_client
+from apps.api.ollama_client import OLLAMA_MODEL, get_ollama_client
 from apps.api.huggingface_client import get_huggingface_client
 from apps.api.openai_client import get_openai_client
 from apps.api.cache import cache_get, cache_set
@@ -36,6 +37,37 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Short prompts without reasoning cues are answered by the local model when
+# Ollama is up, keeping the remote Hugging Face model for harder questions
+LOCAL_PROMPT_MAX_CHARS = int(os.getenv("REDIX_LOCAL_PROMPT_MAX_CHARS", "200"))
+REASONING_KEYWORDS = ("why", "reason", "analy", "explain", "compare", "ethic", "prove")
+# How long the remote model gets to produce its first chunk before Ollama takes over
+REMOTE_FIRST_CHUNK_TIMEOUT = float(os.getenv("REDIX_REMOTE_FIRST_CHUNK_TIMEOUT", "10"))
+
+
+def _prefers_local(prompt: str) -> bool:
+    """Cheap heuristic for prompts a small local model can handle"""
+    if len(prompt) >= LOCAL_PROMPT_MAX_CHARS:
+        return False
+    lowered = prompt.lower()
+    return not any(keyword in lowered for keyword in REASONING_KEYWORDS)
+
+
+async def _first_chunk(stream) -> dict:
+    """Wait a bounded time for a stream's first chunk, reporting failure as an error chunk"""
+    try:
+        return await asyncio.wait_for(stream.__anext__(), timeout=REMOTE_FIRST_CHUNK_TIMEOUT)
+    except StopAsyncIteration:
+        return {"text": "", "done": True, "error": "Empty response"}
+    except asyncio.TimeoutError:
+        return {"text": "", "done": True, "error": f"No response within {REMOTE_FIRST_CHUNK_TIMEOUT:g}s"}
+
+
+async def _prepend(first: dict, stream):
+    yield first
+    async for chunk in stream:
+        yield chunk
+
 
 class AskRequest(BaseModel):
     prompt: str
@@ -65,24 +97,30 @@ async def ask_redix(
     prompt_hash = hashlib.sha256(request.prompt.encode()).hexdigest()[:16]
     cache_key = f"redix:ask:{prompt_hash}"
     
-    if not request.stream:
-        # Non-streaming: return cached if available
-        cached = await cache_get(cache_key)
-        if cached:
-            try:
-                data = json.loads(cached)
-                return {
-                    "response": data.get("response", ""),
-                    "tokens": data.get("tokens", 0),
-                    "cached": True,
-                    "ready": True,
-                }
-            except:
-                pass
+    # One lookup serves both modes; repeated prompts skip the backend probes entirely
+    cached_data = None
+    cached = await cache_get(cache_key)
+    if cached:
+        try:
+            cached_data = json.loads(cached)
+        except ValueError:
+            pass
+    
+    if cached_data is not None and not request.stream:
+        return {
+            "response": cached_data.get("response", ""),
+            "tokens": cached_data.get("tokens", 0),
+            "cached": True,
+            "ready": True,
+        }
     
     # Streaming response
     async def generate():
         try:
+            if cached_data is not None:
+                yield f"data: {json.dumps({'type': 'cached', 'text': cached_data.get('response', ''), 'tokens': cached_data.get('tokens', 0), 'done': True})}\n\n"
+                return
+            
             # Try Redix first (if available via external service)
             redix_available = False
             try:
@@ -91,31 +129,23 @@ async def ask_redix(
                 # For now, we'll use Ollama as the primary backend
                 redix_available = False
             except Exception as e:
-                logger.debug(f"Redix check failed: {e}")
+                logger.debug("Redix check failed: %s", e)
                 redix_available = False
             
             # Try OpenAI first, then Hugging Face, then Ollama
             openai = get_openai_client()
-            openai_available = await openai.check_available()
-            
             hf = get_huggingface_client()
-            hf_available = await hf.check_available()
-            
             ollama = get_ollama_client()
-            ollama_available = await ollama.check_available()
+            
+            # Probe all backends at once so a slow remote check doesn't delay the local path
+            openai_available, hf_available, ollama_available = await asyncio.gather(
+                openai.check_available(),
+                hf.check_available(),
+                ollama.check_available(),
+            )
             
             if not openai_available and not hf_available and not ollama_available:
-                # Offline mode: return cached or simple response
-                cached = await cache_get(cache_key)
-                if cached:
-                    try:
-                        data = json.loads(cached)
-                        yield f"data: {json.dumps({'type': 'cached', 'text': data.get('response', ''), 'done': True})}\n\n"
-                        return
-                    except:
-                        pass
-                
-                # No cache, no backend: return offline message
+                # Offline mode (a cached answer would have been served above)
                 yield f"data: {json.dumps({'type': 'error', 'text': 'AI services unavailable. Please check your OpenAI, Hugging Face API key, or start Ollama.', 'done': True})}\n\n"
                 return
             
@@ -131,26 +161,41 @@ async def ask_redix(
                 },
             ]
             
-            accumulated_text = ""
+            parts: list[str] = []
             total_tokens = 0
+            errored = False
             
             yield f"data: {json.dumps({'type': 'start', 'message': 'Redix is thinking...'})}\n\n"
             
-            if hf_available:
-                # Use Hugging Face for streaming
-                async for chunk in hf.stream_chat(
+            use_local = ollama_available and _prefers_local(request.prompt)
+            
+            remote_stream = None
+            if hf_available and not use_local:
+                hf_stream = hf.stream_chat(
                     messages=messages,
                     model="meta-llama/Meta-Llama-3-8B-Instruct",
                     temperature=0.7,
                     max_tokens=2048,
-                ):
+                )
+                first = await _first_chunk(hf_stream)
+                if first.get("error") and ollama_available:
+                    # Nothing has been sent yet, so the local model can answer instead
+                    logger.warning("Hugging Face failed before its first token (%s); using Ollama", first["error"])
+                    await hf_stream.aclose()
+                else:
+                    remote_stream = _prepend(first, hf_stream)
+            
+            if remote_stream is not None:
+                # Use Hugging Face for streaming
+                async for chunk in remote_stream:
                     if chunk.get("error"):
+                        errored = True
                         yield f"data: {json.dumps({'type': 'error', 'text': chunk['error'], 'done': True})}\n\n"
                         break
                     
                     text = chunk.get("text", "")
                     if text:
-                        accumulated_text += text
+                        parts.append(text)
                         chunk_tokens = max(1, len(text) // 4)
                         total_tokens += chunk_tokens
                         yield f"data: {json.dumps({'type': 'token', 'text': text, 'tokens': chunk_tokens})}\n\n"
@@ -161,27 +206,34 @@ async def ask_redix(
                 # Fallback to Ollama
                 async for chunk in ollama.stream_chat(
                     messages=messages,
-                    model="llama3.2",
+                    model=OLLAMA_MODEL,
                     temperature=0.7,
                     max_tokens=2048,
                 ):
                     if chunk.get("error"):
+                        errored = True
                         yield f"data: {json.dumps({'type': 'error', 'text': chunk['error'], 'done': True})}\n\n"
                         break
                     
                     text = chunk.get("text", "")
                     if text:
-                        accumulated_text += text
+                        parts.append(text)
                         chunk_tokens = max(1, len(text) // 4)
                         total_tokens += chunk_tokens
                         
                         yield f"data: {json.dumps({'type': 'token', 'text': text, 'tokens': chunk_tokens})}\n\n"
                     
                     if chunk.get("done"):
+                        # Ollama reports the real completion count; prefer it over the estimate
+                        usage = chunk.get("usage") or {}
+                        if usage.get("completion_tokens"):
+                            total_tokens = usage["completion_tokens"]
                         break
             
-            # Cache the response
-            if accumulated_text and len(accumulated_text) > 10:
+            accumulated_text = "".join(parts)
+            
+            # Cache the response, unless the stream failed part-way through
+            if accumulated_text and len(accumulated_text) > 10 and not errored:
                 cache_data = {
                     "response": accumulated_text,
                     "tokens": total_tokens,
@@ -46,7 +46,7 @@ class TabResponse(BaseModel):
     created_at: str
 
 @router.get("", response_model=List[WorkspaceResponse])
-async def list_workspaces(
+def list_workspaces(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -66,7 +66,7 @@ async def list_workspaces(
     ]
 
 @router.post("", response_model=WorkspaceResponse)
-async def create_workspace(
+def create_workspace(
     request: WorkspaceCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -94,7 +94,7 @@ async def create_workspace(
     )
 
 @router.get("/{workspace_id}", response_model=WorkspaceResponse)
-async def get_workspace(
+def get_workspace(
     workspace_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -117,7 +117,7 @@ async def get_workspace(
     )
 
 @router.post("/{workspace_id}/tabs", response_model=TabResponse)
-async def create_tab(
+def create_tab(
     workspace_id: str,
     request: TabCreate,
     db: Session = Depends(get_db),
@@ -150,7 +150,7 @@ async def create_tab(
     )
 
 @router.get("/{workspace_id}/tabs", response_model=List[TabResponse])
-async def list_tabs(
+def list_tabs(
     workspace_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
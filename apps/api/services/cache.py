@@ -102,10 +102,10 @@ def get_cached_response(cache_key_str: str, max_age_seconds: int = 3600) -> Opti
     if age > max_age_seconds:
         # Remove expired entry
         del _response_cache[cache_key_str]
-        logger.debug(f"Cache entry expired: {cache_key_str} (age: {age:.0f}s)")
+        logger.debug("Cache entry expired: %s (age: %.0fs)", cache_key_str, age)
         return None
     
-    logger.debug(f"Cache hit: {cache_key_str} (age: {age:.0f}s)")
+    logger.debug("Cache hit: %s (age: %.0fs)", cache_key_str, age)
     return entry.get("response")
 
 
@@ -133,9 +133,9 @@ def set_cached_response(cache_key_str: str, response: Dict[str, Any], ttl_second
             key=lambda k: _response_cache[k].get("cached_at", datetime.utcnow()),
         )
         del _response_cache[oldest_key]
-        logger.debug(f"Evicted oldest cache entry: {oldest_key}")
+        logger.debug("Evicted oldest cache entry: %s", oldest_key)
     
-    logger.debug(f"Cached response: {cache_key_str} (TTL: {ttl_seconds}s)")
+    logger.debug("Cached response: %s (TTL: %ss)", cache_key_str, ttl_seconds)
 
 
 def should_cache(kind: str, prompt: str) -> bool:
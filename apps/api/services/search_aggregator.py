@@ -5,110 +5,314 @@ with advanced source ranking, deduplication, relevance scoring, and AI summariza
 """
 
 import asyncio
+import contextlib
+import copy
+import functools
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from html import unescape
+from typing import AsyncGenerator, Awaitable, List, Dict, Any, Optional, Tuple
 import aiohttp
-from urllib.parse import quote_plus, urlparse
+import numpy as np
+import orjson
+from urllib.parse import quote_plus, urlsplit
 import re
 from datetime import datetime, timedelta
 
+from apps.api.ollama_client import OLLAMA_MODEL
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:  # pragma: no cover - optional fast HTML parser
+    HTMLParser = None
+
 logger = logging.getLogger(__name__)
 
+# Timeouts are built once and set on each session; the Instant Answer lookup
+# is the only request that overrides its session's timeout
+_API_TIMEOUT = aiohttp.ClientTimeout(total=5)
+_SCRAPE_TIMEOUT = aiohttp.ClientTimeout(total=8)
+_SCRAPE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+# Ranked results are cached in-process; each entry expires after SEARCH_CACHE_TTL
+# seconds +/- SEARCH_CACHE_TTL_JITTER so identical queries don't all refetch at once
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "600"))
+SEARCH_CACHE_TTL_JITTER = float(os.getenv("SEARCH_CACHE_TTL_JITTER", "0.25"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256"))
+_search_cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Any]]" = OrderedDict()
+
+# aggregate_search stops waiting on slower sources once this many times
+# max_results have been collected (each source returns at most max_results)
+SEARCH_EARLY_RETURN_RATIO = float(os.getenv("SEARCH_EARLY_RETURN_RATIO", "1.0"))
+# Results collected before the slower sources finished are only cached briefly,
+# so the full set is fetched again soon instead of one source serving the whole TTL
+SEARCH_PARTIAL_CACHE_TTL = int(os.getenv("SEARCH_PARTIAL_CACHE_TTL", "30"))
+
+# AI summaries are keyed by query + the URLs they were generated from
+SUMMARY_CACHE_TTL = int(os.getenv("SEARCH_SUMMARY_CACHE_TTL", "300"))
+_summary_cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Any]]" = OrderedDict()
+
+# Backend availability probes are reused for a short window so a burst of
+# summaries pays for one health check per backend, not one per call
+BACKEND_AVAILABILITY_TTL = float(os.getenv("SEARCH_BACKEND_AVAILABILITY_TTL", "30"))
+_backend_availability: Dict[str, Tuple[float, bool]] = {}
+
+# AI backends for summarization, in priority order
+_SUMMARY_MODELS: Dict[str, str] = {
+    'openai': "gpt-4o-mini",
+    'huggingface': "meta-llama/Meta-Llama-3-8B-Instruct",
+    'ollama': OLLAMA_MODEL,
+}
 
+_WORD_RE = re.compile(r'\w+')
+_TAG_RE = re.compile(r'<[^>]+>')
+# Regex fallbacks used when selectolax is not installed. They are applied to
+# one result block at a time (see _split_blocks), never to the whole page.
+# Only the result containers themselves (class "result" or "result ..."), never
+# their result__* children, which sit between the title and the snippet
+_DDG_RESULT_MARKER = re.compile(r'<div class="result(?:\s[^"]*)?"')
+_BING_RESULT_MARKER = re.compile(r'<li class="b_algo"')
+_DDG_RESULT_RE = re.compile(
+    r'<div class="result[^"]*"[^>]*>.*?<a[^>]*class="result__a"[^>]*href="([^"]+)"[^>]*>(.*?)</a>.*?<a[^>]*class="result__snippet"[^>]*>(.*?)</a>',
+    re.DOTALL,
+)
+_BING_RESULT_RE = re.compile(
+    r'<li class="b_algo"[^>]*>.*?<h2[^>]*><a[^>]*href="([^"]+)"[^>]*>(.*?)</a></h2>.*?<p[^>]*>(.*?)</p>',
+    re.DOTALL,
+)
+
+
+@dataclass(slots=True)
 class SearchResult:
     """Represents a search result from any source"""
-    def __init__(
-        self,
-        title: str,
-        url: str,
-        snippet: str,
-        source: str,
-        rank: int = 0,
-        relevance_score: float = 0.0,
-    ):
-        self.title = title
-        self.url = url
-        self.snippet = snippet
-        self.source = source
-        self.rank = rank
-        self.relevance_score = relevance_score
+    title: str
+    url: str
+    snippet: str
+    source: str
+    rank: int = 0
+    relevance_score: float = 0.0
+    # Ranking features, filled in once by rank_and_deduplicate_results
+    _domain: str = field(default='', repr=False, compare=False)
+    _authority: float = field(default=0.5, repr=False, compare=False)
+    _terms: List[str] = field(default_factory=list, repr=False, compare=False)
+
+
+def _split_blocks(html: str, marker: re.Pattern):
+    """
+    Yield the slices of html that start at each match of marker.
+    Bounds the regex fallbacks' lazy .*? scans to a single result instead of
+    letting them backtrack across the rest of the page.
+    """
+    starts = [match.start() for match in marker.finditer(html)]
+    for start, end in zip(starts, starts[1:] + [len(html)]):
+        yield html[start:end]
+
+
+def _strip_tags(fragment: str) -> str:
+    """Remove markup from a regex-captured HTML fragment and decode entities (&amp; etc.)"""
+    return unescape(_TAG_RE.sub('', fragment)).strip()
+
+
+def _parse_duckduckgo_html(html: str, start: int, limit: int) -> List[SearchResult]:
+    """
+    Extract results from the DuckDuckGo HTML endpoint.
+    DuckDuckGo HTML structure: results are in <div class="result">
+    """
+    results: List[SearchResult] = []
+    if limit <= 0:
+        return results
+
+    if HTMLParser is not None:
+        items = []
+        for node in HTMLParser(html).css('div.result'):
+            link = node.css_first('a.result__a')
+            snippet_node = node.css_first('a.result__snippet')
+            if link is None or snippet_node is None:
+                continue
+            items.append((
+                link.attributes.get('href') or '',
+                link.text().strip(),
+                snippet_node.text().strip(),
+            ))
+    else:
+        # Regex fallback when selectolax is not installed
+        items = (
+            (
+                match.group(1),
+                _strip_tags(match.group(2)),
+                _strip_tags(match.group(3)),
+            )
+            for match in map(_DDG_RESULT_RE.match, _split_blocks(html, _DDG_RESULT_MARKER))
+            if match
+        )
+
+    for idx, (url, title, snippet) in enumerate(items, start=start):
+        if len(results) >= limit:
+            break
+
+        if url and title and snippet:
+            results.append(SearchResult(
+                title=title[:200],
+                url=url,
+                snippet=snippet[:300],
+                source='duckduckgo',
+                rank=idx,
+                relevance_score=0.6,  # Lower score for scraped results
+            ))
+
+    return results
+
+
+def _parse_bing_html(html: str, limit: int) -> List[SearchResult]:
+    """
+    Extract results from a Bing search results page.
+    Bing structure: results are in <li class="b_algo">
+    """
+    results: List[SearchResult] = []
+    if limit <= 0:
+        return results
+
+    if HTMLParser is not None:
+        items = []
+        for node in HTMLParser(html).css('li.b_algo'):
+            link = node.css_first('h2 a')
+            snippet_node = node.css_first('p')
+            if link is None or snippet_node is None:
+                continue
+            items.append((
+                link.attributes.get('href') or '',
+                link.text().strip(),
+                snippet_node.text().strip(),
+            ))
+    else:
+        # Regex fallback when selectolax is not installed
+        items = (
+            (
+                match.group(1),
+                _strip_tags(match.group(2)),
+                _strip_tags(match.group(3)),
+            )
+            for match in map(_BING_RESULT_RE.match, _split_blocks(html, _BING_RESULT_MARKER))
+            if match
+        )
+
+    for idx, (url, title, snippet) in enumerate(items, start=1):
+        if len(results) >= limit:
+            break
+
+        if url and title and snippet:
+            results.append(SearchResult(
+                title=title[:200],
+                url=url,
+                snippet=snippet[:300],
+                source='bing',
+                rank=idx,
+                relevance_score=0.65,  # Lower score for scraped results
+            ))
+
+    return results
+
+
+async def _fetch_duckduckgo_instant(
+    session: aiohttp.ClientSession,
+    query: str,
+    max_results: int,
+) -> List[SearchResult]:
+    """
+    Query the DuckDuckGo Instant Answer API
+    """
+    results: List[SearchResult] = []
+
+    try:
+        url = f"https://api.duckduckgo.com/?q={quote_plus(query)}&format=json&no_html=1&skip_disambig=1"
+        async with session.get(url, timeout=_API_TIMEOUT) as resp:
+            if resp.status == 200:
+                data = orjson.loads(await resp.read())
+                
+                # Add abstract if available
+                if data.get('AbstractText'):
+                    results.append(SearchResult(
+                        title=data.get('Heading', query),
+                        url=data.get('AbstractURL', ''),
+                        snippet=data.get('AbstractText', ''),
+                        source='duckduckgo',
+                        rank=1,
+                        relevance_score=0.9,
+                    ))
+                
+                # Add related topics
+                if data.get('RelatedTopics'):
+                    for idx, topic in enumerate(data.get('RelatedTopics', [])[:max_results - len(results)], start=len(results) + 1):
+                        if isinstance(topic, dict) and topic.get('Text'):
+                            results.append(SearchResult(
+                                title=topic.get('Text', '')[:100],
+                                url=topic.get('FirstURL', ''),
+                                snippet=topic.get('Text', ''),
+                                source='duckduckgo',
+                                rank=idx,
+                                relevance_score=0.7,
+                            ))
+    except Exception as e:
+        logger.debug("DuckDuckGo Instant Answer lookup failed: %s", e)
+
+    return results
+
+
+async def _fetch_duckduckgo_html(session: aiohttp.ClientSession, query: str) -> Optional[str]:
+    """
+    Fetch the DuckDuckGo HTML results page for scraping
+    """
+    try:
+        html_url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
+        async with session.get(html_url, headers=_SCRAPE_HEADERS) as resp:
+            if resp.status == 200:
+                return await resp.text()
+    except Exception as e:
+        logger.debug("DuckDuckGo HTML scraping failed: %s", e)
+
+    return None
 
 
 async def search_duckduckgo(query: str, max_results: int = 10) -> List[SearchResult]:
     """
-    Search DuckDuckGo using Instant Answer API and HTML scraping
+    Search DuckDuckGo using Instant Answer API and HTML scraping.
+    Both requests are issued concurrently; the HTML scrape is cancelled
+    if the Instant Answer API alone fills max_results.
     """
     results: List[SearchResult] = []
     
     try:
-        async with aiohttp.ClientSession() as session:
-            # Try Instant Answer API first
-            url = f"https://api.duckduckgo.com/?q={quote_plus(query)}&format=json&no_html=1&skip_disambig=1"
-            async with session.get(url, timeout=5) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    
-                    # Add abstract if available
-                    if data.get('AbstractText'):
-                        results.append(SearchResult(
-                            title=data.get('Heading', query),
-                            url=data.get('AbstractURL', ''),
-                            snippet=data.get('AbstractText', ''),
-                            source='duckduckgo',
-                            rank=1,
-                            relevance_score=0.9,
-                        ))
-                    
-                    # Add related topics
-                    if data.get('RelatedTopics'):
-                        for idx, topic in enumerate(data.get('RelatedTopics', [])[:max_results - len(results)], start=len(results) + 1):
-                            if isinstance(topic, dict) and topic.get('Text'):
-                                results.append(SearchResult(
-                                    title=topic.get('Text', '')[:100],
-                                    url=topic.get('FirstURL', ''),
-                                    snippet=topic.get('Text', ''),
-                                    source='duckduckgo',
-                                    rank=idx,
-                                    relevance_score=0.7,
-                                ))
-            
-            # Fallback: Use HTML scraping for more results
-            if len(results) < max_results:
-                try:
-                    html_url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
-                    async with session.get(html_url, timeout=8, headers={
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                    }) as resp:
-                        if resp.status == 200:
-                            html = await resp.text()
-                            
-                            # Parse HTML results using regex (simple but effective)
-                            # DuckDuckGo HTML structure: results are in <div class="result">
-                            result_pattern = r'<div class="result[^"]*"[^>]*>.*?<a[^>]*class="result__a"[^>]*href="([^"]+)"[^>]*>(.*?)</a>.*?<a[^>]*class="result__snippet"[^>]*>(.*?)</a>'
-                            matches = re.finditer(result_pattern, html, re.DOTALL)
-                            
-                            for idx, match in enumerate(matches, start=len(results) + 1):
-                                if len(results) >= max_results:
-                                    break
-                                
-                                url = match.group(1)
-                                title = re.sub(r'<[^>]+>', '', match.group(2)).strip()
-                                snippet = re.sub(r'<[^>]+>', '', match.group(3)).strip()
-                                
-                                if url and title and snippet:
-                                    results.append(SearchResult(
-                                        title=title[:200],
-                                        url=url,
-                                        snippet=snippet[:300],
-                                        source='duckduckgo',
-                                        rank=idx,
-                                        relevance_score=0.6,  # Lower score for scraped results
-                                    ))
-                except Exception as e:
-                    logger.debug(f"DuckDuckGo HTML scraping failed: {e}")
+        async with aiohttp.ClientSession(timeout=_SCRAPE_TIMEOUT) as session:
+            html_task = asyncio.create_task(_fetch_duckduckgo_html(session, query))
+            try:
+                results = await _fetch_duckduckgo_instant(session, query, max_results)
+                
+                # Fallback: Use HTML scraping for more results
+                if len(results) < max_results:
+                    html = await html_task
+                    if html:
+                        results.extend(
+                            _parse_duckduckgo_html(
+                                html,
+                                start=len(results) + 1,
+                                limit=max_results - len(results),
+                            )
+                        )
+            finally:
+                if not html_task.done():
+                    html_task.cancel()
+                # Reap the scrape so a cancelled or failed task is never left unobserved
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await html_task
                         
     except Exception as e:
-        logger.debug(f"DuckDuckGo search failed: {e}")
+        logger.debug("DuckDuckGo search failed: %s", e)
     
     return results[:max_results]
 
@@ -123,7 +327,7 @@ async def search_bing(query: str, max_results: int = 10, api_key: Optional[str]
     # If API key is available, use Bing Search API
     if api_key:
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=_API_TIMEOUT) as session:
                 url = "https://api.bing.microsoft.com/v7.0/search"
                 headers = {
                     'Ocp-Apim-Subscription-Key': api_key,
@@ -133,9 +337,9 @@ async def search_bing(query: str, max_results: int = 10, api_key: Optional[str]
                     'count': max_results,
                     'mkt': 'en-US',
                 }
-                async with session.get(url, headers=headers, params=params, timeout=5) as resp:
+                async with session.get(url, headers=headers, params=params) as resp:
                     if resp.status == 200:
-                        data = await resp.json()
+                        data = orjson.loads(await resp.read())
                         web_results = data.get('webPages', {}).get('value', [])
                         
                         for idx, item in enumerate(web_results, start=1):
@@ -148,81 +352,98 @@ async def search_bing(query: str, max_results: int = 10, api_key: Optional[str]
                                 relevance_score=0.8,
                             ))
         except Exception as e:
-            logger.debug(f"Bing API search failed: {e}")
+            logger.debug("Bing API search failed: %s", e)
     
     # Fallback: Web scraping (simplified)
     if not results:
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=_SCRAPE_TIMEOUT) as session:
                 url = f"https://www.bing.com/search?q={quote_plus(query)}"
-                async with session.get(url, timeout=8, headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                }) as resp:
+                async with session.get(url, headers=_SCRAPE_HEADERS) as resp:
                     if resp.status == 200:
                         html = await resp.text()
                         
-                        # Parse Bing HTML results
-                        # Bing structure: results are in <li class="b_algo">
-                        result_pattern = r'<li class="b_algo"[^>]*>.*?<h2[^>]*><a[^>]*href="([^"]+)"[^>]*>(.*?)</a></h2>.*?<p[^>]*>(.*?)</p>'
-                        matches = re.finditer(result_pattern, html, re.DOTALL)
-                        
-                        for idx, match in enumerate(matches, start=1):
-                            if len(results) >= max_results:
-                                break
-                            
-                            url = match.group(1)
-                            title = re.sub(r'<[^>]+>', '', match.group(2)).strip()
-                            snippet = re.sub(r'<[^>]+>', '', match.group(3)).strip()
-                            
-                            if url and title and snippet:
-                                results.append(SearchResult(
-                                    title=title[:200],
-                                    url=url,
-                                    snippet=snippet[:300],
-                                    source='bing',
-                                    rank=idx,
-                                    relevance_score=0.65,  # Lower score for scraped results
-                                ))
+                        results.extend(_parse_bing_html(html, limit=max_results))
         except Exception as e:
-            logger.debug(f"Bing web search failed: {e}")
+            logger.debug("Bing web search failed: %s", e)
     
     return results[:max_results]
 
 
+# Known authoritative domains (matched against the domain and its parent domains)
+_AUTHORITY_DOMAINS: Dict[str, float] = {
+    'wikipedia.org': 0.95,
+    'github.com': 0.90,
+    'stackoverflow.com': 0.90,
+    'reddit.com': 0.75,
+    'medium.com': 0.70,
+    'youtube.com': 0.80,
+    'arxiv.org': 0.95,
+}
+
+# Fallback scores by top-level domain
+_AUTHORITY_TLDS: Dict[str, float] = {
+    'edu': 0.85,  # Educational domains
+    'gov': 0.90,  # Government domains
+    'org': 0.70,  # Organizations
+}
+
+
+@functools.lru_cache(maxsize=4096)
 def calculate_domain_authority(domain: str) -> float:
     """
     Calculate domain authority score based on known authoritative domains
+    (memoized; the score depends only on the domain)
     """
-    authority_domains = {
-        'wikipedia.org': 0.95,
-        'github.com': 0.90,
-        'stackoverflow.com': 0.90,
-        'reddit.com': 0.75,
-        'medium.com': 0.70,
-        'youtube.com': 0.80,
-        'arxiv.org': 0.95,
-        'edu': 0.85,  # Educational domains
-        'gov': 0.90,  # Government domains
-        'org': 0.70,  # Organizations
-    }
-    
     domain_lower = domain.lower()
     
-    # Check exact matches
-    for auth_domain, score in authority_domains.items():
-        if auth_domain in domain_lower:
+    # Check exact matches, then each parent domain (en.wikipedia.org -> wikipedia.org)
+    candidate = domain_lower
+    while True:
+        score = _AUTHORITY_DOMAINS.get(candidate)
+        if score is not None:
             return score
+        _, dot, parent = candidate.partition('.')
+        if not dot:
+            break
+        candidate = parent
     
-    # Check TLD
-    if domain_lower.endswith('.edu'):
-        return 0.85
-    if domain_lower.endswith('.gov'):
-        return 0.90
-    if domain_lower.endswith('.org'):
-        return 0.70
-    
-    # Default score
-    return 0.50
+    # Check TLD (candidate is now the last label); default score otherwise
+    return _AUTHORITY_TLDS.get(candidate, 0.50)
+
+
+def _bm25_scores(
+    query_terms: frozenset,
+    documents: List[List[str]],
+    k1: float = 1.2,
+    b: float = 0.75,
+) -> np.ndarray:
+    """
+    Okapi BM25 score of each tokenized document against the query terms.
+    Uses the non-negative IDF variant so terms common to the small candidate
+    pool still count slightly instead of being penalized.
+    """
+    n_docs = len(documents)
+    if not n_docs or not query_terms:
+        return np.zeros(n_docs)
+    
+    # (n_docs, n_terms) matrix of query term frequencies; tokens that are not
+    # query terms only contribute to document length
+    columns = {term: col for col, term in enumerate(query_terms)}
+    tf = np.zeros((n_docs, len(columns)))
+    for row, doc in enumerate(documents):
+        for token in doc:
+            col = columns.get(token)
+            if col is not None:
+                tf[row, col] += 1
+    doc_lengths = np.fromiter((len(doc) for doc in documents), dtype=np.float64, count=n_docs)
+    avg_length = doc_lengths.mean() or 1.0
+    
+    doc_freq = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+    length_norm = k1 * (1 - b + b * doc_lengths / avg_length)
+    
+    return (idf * tf * (k1 + 1) / (tf + length_norm[:, None])).sum(axis=1)
 
 
 def rank_and_deduplicate_results(
@@ -233,200 +454,246 @@ def rank_and_deduplicate_results(
     """
     Advanced ranking and deduplication with domain authority, recency, and relevance
     """
-    # Deduplicate by URL (normalize URLs)
+    query_lower = query.lower()
+    query_words = frozenset(_WORD_RE.findall(query_lower))
+
+    # Deduplicate by URL (normalize URLs), computing per-result features once
     seen_urls = set()
     unique_results: List[SearchResult] = []
     
     for result in all_results:
         try:
-            parsed = urlparse(result.url)
+            parsed = urlsplit(result.url)
             # Normalize: remove www, trailing slash, query params for deduplication
-            domain = parsed.netloc.lower().replace('www.', '')
-            path = parsed.path.rstrip('/')
-            url_normalized = f"{domain}{path}".lower()
+            domain = parsed.netloc.lower().removeprefix('www.')
+            url_normalized = domain + parsed.path.rstrip('/').lower()
             
             if url_normalized not in seen_urls and url_normalized and result.url:
                 seen_urls.add(url_normalized)
+                result._domain = domain
+                result._authority = calculate_domain_authority(domain)
+                # Snippets are display-truncated to ~300 chars; don't tokenize beyond that
+                result._terms = _WORD_RE.findall(f"{result.title} {result.snippet[:300]}".lower())
                 unique_results.append(result)
         except Exception:
             # Skip invalid URLs
             continue
     
-    # Calculate enhanced relevance scores
-    query_lower = query.lower()
-    query_words = set(re.findall(r'\w+', query_lower))
-    
-    for result in unique_results:
-        # Start with base score from source
-        score = result.relevance_score
-        
-        # Extract domain for authority scoring
-        try:
-            domain = urlparse(result.url).netloc.lower().replace('www.', '')
-            domain_authority = calculate_domain_authority(domain)
-            score += domain_authority * 0.2  # Authority boost (up to +0.2)
-        except Exception:
-            domain_authority = 0.5
-        
-        # Title matching (strong signal)
-        title_lower = result.title.lower()
-        title_words = set(re.findall(r'\w+', title_lower))
-        title_overlap = len(query_words & title_words)
-        if title_overlap > 0:
-            score += (title_overlap / len(query_words)) * 0.3  # Up to +0.3
-        
-        # Exact phrase match in title (very strong signal)
-        if query_lower in title_lower:
-            score += 0.2
-        
-        # Snippet matching
-        snippet_lower = result.snippet.lower()
-        snippet_words = set(re.findall(r'\w+', snippet_lower))
-        snippet_overlap = len(query_words & snippet_words)
-        if snippet_overlap > 0:
-            score += (snippet_overlap / len(query_words)) * 0.15  # Up to +0.15
-        
-        # Exact phrase match in snippet
-        if query_lower in snippet_lower:
-            score += 0.1
-        
-        # Penalize very short snippets
-        if len(result.snippet) < 20:
-            score -= 0.15
-        elif len(result.snippet) > 200:
-            score += 0.05  # Prefer longer, more informative snippets
-        
-        # Boost if URL contains query words
-        url_lower = result.url.lower()
-        url_matches = sum(1 for word in query_words if word in url_lower)
-        if url_matches > 0:
-            score += url_matches * 0.05
-        
-        # Normalize score to 0-1 range
-        result.relevance_score = min(1.0, max(0.0, score))
+    n_results = len(unique_results)
+    if not n_results:
+        return unique_results
+    
+    # Per-result features as contiguous arrays, scored in one vector expression
+    base = np.fromiter((r.relevance_score for r in unique_results), dtype=np.float64, count=n_results)
+    authority = np.fromiter((r._authority for r in unique_results), dtype=np.float64, count=n_results)
+    
+    # Term relevance: BM25 over title + snippet, normalized to the best match in the pool
+    bm25 = _bm25_scores(query_words, [r._terms for r in unique_results])
+    max_bm25 = bm25.max()
+    if max_bm25 > 0:
+        bm25 /= max_bm25
+    
+    phrase_in_title = np.fromiter((query_lower in r.title.lower() for r in unique_results), dtype=bool, count=n_results)
+    phrase_in_snippet = np.fromiter((query_lower in r.snippet.lower() for r in unique_results), dtype=bool, count=n_results)
+    snippet_len = np.fromiter((len(r.snippet) for r in unique_results), dtype=np.int64, count=n_results)
+    # Lowercase each URL once; a C-level substring test per query word beats
+    # building a multi-pattern automaton for queries of a few words
+    url_lowers = [r.url.lower() for r in unique_results]
+    url_matches = np.fromiter(
+        (sum(word in url for word in query_words) for url in url_lowers),
+        dtype=np.float64,
+        count=n_results,
+    )
+    
+    score = (
+        base
+        + authority * 0.2  # Authority boost (up to +0.2)
+        + bm25 * 0.45  # Query term relevance (up to +0.45)
+        + phrase_in_title * 0.2  # Exact phrase match in title (very strong signal)
+        + phrase_in_snippet * 0.1  # Exact phrase match in snippet
+        - (snippet_len < 20) * 0.15  # Penalize very short snippets
+        + (snippet_len > 200) * 0.05  # Prefer longer, more informative snippets
+        + url_matches * 0.05  # Boost if URL contains query words
+    )
+    # Normalize score to 0-1 range
+    np.clip(score, 0.0, 1.0, out=score)
     
     # Sort by relevance score (descending), then by source priority, then by domain authority
     source_priority = {'duckduckgo': 1, 'bing': 2}
+    priority = np.fromiter((source_priority.get(r.source, 99) for r in unique_results), dtype=np.int64, count=n_results)
+    order = np.lexsort((-authority, priority, -score))[:max_results]
     
-    def sort_key(r: SearchResult) -> tuple:
-        try:
-            domain = urlparse(r.url).netloc.lower().replace('www.', '')
-            authority = calculate_domain_authority(domain)
-        except Exception:
-            authority = 0.5
-        
-        return (
-            -r.relevance_score,  # Higher relevance first
-            source_priority.get(r.source, 99),  # Source priority
-            -authority,  # Higher authority first
-        )
-    
-    unique_results.sort(key=sort_key)
+    ranked_results: List[SearchResult] = []
+    for idx in order:
+        result = unique_results[idx]
+        result.relevance_score = float(score[idx])
+        ranked_results.append(result)
     
-    return unique_results[:max_results]
+    return ranked_results
+
+
+def _summary_cache_key(query: str, results: List[SearchResult], max_summary_length: int) -> Tuple[Any, ...]:
+    return (
+        query.strip().lower(),
+        tuple(result.url for result in results[:5]),
+        max_summary_length,
+    )
 
 
 async def summarize_search_results(
     query: str,
-    results: List[Dict[str, Any]],
+    results: List[SearchResult],
     max_summary_length: int = 200,
 ) -> str:
     """
     Summarize search results using AI
+    
+    AI summaries are memoized per (query, top result URLs, length) for
+    SEARCH_SUMMARY_CACHE_TTL seconds; fallback summaries are not cached.
     """
     if not results or len(results) == 0:
         return "No search results to summarize."
     
+    cache_key = _summary_cache_key(query, results, max_summary_length)
+    cached = _cache_get(_summary_cache, cache_key)
+    if cached is not None:
+        return cached
+    
+    parts: List[str] = []
+    try:
+        async for text in _stream_ai_summary(query, results, max_summary_length):
+            parts.append(text)
+    except Exception as e:
+        logger.warning("AI summarization failed: %s", e)
+        return generate_fallback_summary(query, results)
+    
+    summary = "".join(parts)
+    if not summary:
+        return generate_fallback_summary(query, results)
+    
+    _cache_set(_summary_cache, cache_key, summary, SUMMARY_CACHE_TTL)
+    return summary
+
+
+async def summarize_search_results_stream(
+    query: str,
+    results: List[SearchResult],
+    max_summary_length: int = 200,
+) -> AsyncGenerator[str, None]:
+    """
+    Stream a summary of search results as text chunks as the AI backend produces them
+    
+    Cached summaries are yielded in one chunk. If the backend fails before
+    producing any text, the fallback summary is yielded instead; a summary
+    interrupted part-way is not cached.
+    """
+    if not results or len(results) == 0:
+        yield "No search results to summarize."
+        return
+    
+    cache_key = _summary_cache_key(query, results, max_summary_length)
+    cached = _cache_get(_summary_cache, cache_key)
+    if cached is not None:
+        yield cached
+        return
+    
+    parts: List[str] = []
+    try:
+        async for text in _stream_ai_summary(query, results, max_summary_length):
+            parts.append(text)
+            yield text
+    except Exception as e:
+        logger.warning("AI summarization failed: %s", e)
+        if not parts:
+            yield generate_fallback_summary(query, results)
+        return
+    
+    if not parts:
+        yield generate_fallback_summary(query, results)
+        return
+    
+    _cache_set(_summary_cache, cache_key, "".join(parts), SUMMARY_CACHE_TTL)
+
+
+async def _is_backend_available(name: str, client: Any) -> bool:
+    """
+    Check backend availability, reusing the last probe for BACKEND_AVAILABILITY_TTL seconds
+    """
+    now = time.monotonic()
+    cached = _backend_availability.get(name)
+    if cached is not None and now < cached[0]:
+        return cached[1]
+    
+    available = bool(await client.check_available())
+    _backend_availability[name] = (now + BACKEND_AVAILABILITY_TTL, available)
+    return available
+
+
+async def _stream_ai_summary(
+    query: str,
+    results: List[SearchResult],
+    max_summary_length: int,
+) -> AsyncGenerator[str, None]:
+    """
+    Stream summary text from the first available AI backend.
+    Yields nothing when no backend is available.
+    """
     # Build context from top results
     top_results = results[:5]  # Use top 5 results
     context_parts = [f"Query: {query}\n\nSearch Results:"]
     
     for idx, result in enumerate(top_results, 1):
         context_parts.append(
-            f"{idx}. {result.get('title', 'Untitled')}\n"
-            f"   URL: {result.get('url', '')}\n"
-            f"   Snippet: {result.get('snippet', '')[:200]}"
+            f"{idx}. {result.title or 'Untitled'}\n"
+            f"   URL: {result.url}\n"
+            f"   Snippet: {result.snippet[:200]}"
         )
     
     context = "\n\n".join(context_parts)
     
-    # Try to get AI client
-    try:
-        from apps.api.openai_client import get_openai_client
-        from apps.api.huggingface_client import get_huggingface_client
-        from apps.api.ollama_client import get_ollama_client
-        
-        openai = get_openai_client()
-        openai_available = await openai.check_available()
-        
-        hf = get_huggingface_client()
-        hf_available = await hf.check_available()
-        
-        ollama = get_ollama_client()
-        ollama_available = await ollama.check_available()
-        
-        if not openai_available and not hf_available and not ollama_available:
-            # Fallback to simple summary
-            return generate_fallback_summary(query, results)
-        
-        # Build prompt
-        system_prompt = "You are a search assistant. Summarize search results concisely."
-        user_prompt = f"""Based on these search results, provide a {max_summary_length}-word summary answering: "{query}"
+    # Build prompt
+    system_prompt = "You are a search assistant. Summarize search results concisely."
+    user_prompt = f"""Based on these search results, provide a {max_summary_length}-word summary answering: "{query}"
 
 {context}
 
 Provide a concise summary that synthesizes information from the top results."""
-        
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-        
-        # Try AI backends
-        if openai_available:
-            summary_text = ""
-            async for chunk in openai.stream_chat(
-                messages=messages,
-                model="gpt-4o-mini",
-                temperature=0.5,
-                max_tokens=max_summary_length,
-            ):
-                if chunk.get("text"):
-                    summary_text += chunk["text"]
-                if chunk.get("done"):
-                    break
-            return summary_text or generate_fallback_summary(query, results)
-        
-        elif hf_available:
-            summary_text = ""
-            async for chunk in hf.stream_chat(
-                messages=messages,
-                model="meta-llama/Meta-Llama-3-8B-Instruct",
-                temperature=0.5,
-                max_tokens=max_summary_length,
-            ):
-                if chunk.get("text"):
-                    summary_text += chunk["text"]
-                if chunk.get("done"):
-                    break
-            return summary_text or generate_fallback_summary(query, results)
-        
-        else:
-            response = await ollama.chat(
-                messages=messages,
-                model="llama3.2",
-                temperature=0.5,
-                max_tokens=max_summary_length,
-            )
-            answer = response.get("message", {}).get("content", "")
-            return answer or generate_fallback_summary(query, results)
     
-    except Exception as e:
-        logger.warning(f"AI summarization failed: {e}")
-        return generate_fallback_summary(query, results)
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+    
+    # Try AI backends in priority order, stopping at the first available one
+    from apps.api.openai_client import get_openai_client
+    from apps.api.huggingface_client import get_huggingface_client
+    from apps.api.ollama_client import get_ollama_client
+    
+    backends = (
+        ('openai', get_openai_client),
+        ('huggingface', get_huggingface_client),
+        ('ollama', get_ollama_client),
+    )
+    
+    for name, get_client in backends:
+        client = get_client()
+        if not await _is_backend_available(name, client):
+            continue
+        
+        async for chunk in client.stream_chat(
+            messages=messages,
+            model=_SUMMARY_MODELS[name],
+            temperature=0.5,
+            max_tokens=max_summary_length,
+        ):
+            if chunk.get("text"):
+                yield chunk["text"]
+            if chunk.get("done"):
+                break
+        return
 
 
-def generate_fallback_summary(query: str, results: List[Dict[str, Any]]) -> str:
+def generate_fallback_summary(query: str, results: List[SearchResult]) -> str:
     """
     Generate a simple fallback summary without AI
     """
@@ -435,73 +702,179 @@ def generate_fallback_summary(query: str, results: List[Dict[str, Any]]) -> str:
     
     top_domains = {}
     for result in results[:5]:
-        domain = result.get('domain', '')
+        domain = result._domain
         if domain:
             top_domains[domain] = top_domains.get(domain, 0) + 1
     
     domain_list = ", ".join(list(top_domains.keys())[:3])
     
-    return f"Found {len(results)} results for '{query}' from sources including {domain_list}. Top results cover: {', '.join([r.get('title', '')[:30] for r in results[:3]])}."
+    return f"Found {len(results)} results for '{query}' from sources including {domain_list}. Top results cover: {', '.join([r.title[:30] for r in results[:3]])}."
 
 
-async def aggregate_search(
+def _search_cache_key(query: str, sources: List[str], max_results: int, bing_api_key: Optional[str]) -> Tuple[Any, ...]:
+    return (query.strip().lower(), tuple(sorted(sources)), max_results, bool(bing_api_key))
+
+
+def _cache_get(cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Any]]", key: Tuple[Any, ...]) -> Any:
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    
+    expires_at, value = entry
+    if time.monotonic() >= expires_at:
+        del cache[key]
+        return None
+    
+    cache.move_to_end(key)
+    # Callers may mutate the returned value, so never hand out the cached one
+    return copy.deepcopy(value)
+
+
+def _cache_set(
+    cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Any]]",
+    key: Tuple[Any, ...],
+    value: Any,
+    ttl_seconds: int,
+) -> None:
+    if ttl_seconds <= 0:
+        return
+    
+    ttl = ttl_seconds * random.uniform(1 - SEARCH_CACHE_TTL_JITTER, 1 + SEARCH_CACHE_TTL_JITTER)
+    cache[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+    cache.move_to_end(key)
+    while len(cache) > SEARCH_CACHE_MAX_ENTRIES:
+        cache.popitem(last=False)
+
+
+def invalidate_search_cache(query: Optional[str] = None) -> int:
+    """
+    Drop cached search results and summaries for a query (all entries if query is None)
+    
+    Returns:
+        Number of entries removed
+    """
+    count = 0
+    normalized = query.strip().lower() if query is not None else None
+    
+    for cache in (_search_cache, _summary_cache):
+        if normalized is None:
+            count += len(cache)
+            cache.clear()
+            continue
+        
+        keys = [key for key in cache if key[0] == normalized]
+        for key in keys:
+            del cache[key]
+        count += len(keys)
+    
+    return count
+
+
+async def _search_source(name: str, search: Awaitable[List[SearchResult]]) -> List[SearchResult]:
+    """
+    Await one source's search, logging failures and returning an empty list instead of raising
+    """
+    try:
+        return await search
+    except Exception as e:
+        logger.debug("Search source %s failed: %s", name, e)
+        return []
+
+
+def results_to_dicts(results: List[SearchResult]) -> List[Dict[str, Any]]:
+    """
+    Convert ranked results to the API response format
+    """
+    return [
+        {
+            'title': r.title,
+            'url': r.url,
+            'snippet': r.snippet,
+            'source': r.source,
+            'relevance_score': round(r.relevance_score, 3),
+            'rank': idx + 1,
+            'domain': urlsplit(r.url).netloc if r.url else '',
+        }
+        for idx, r in enumerate(results)
+    ]
+
+
+async def search_ranked_results(
     query: str,
     sources: List[str] = None,
     max_results: int = 20,
     bing_api_key: Optional[str] = None,
-    include_summary: bool = False,
-    summary_length: int = 200,
-) -> Any:  # Returns List[Dict] or Dict[str, Any] depending on include_summary
+) -> List[SearchResult]:
     """
-    Aggregate search results from multiple sources with optional AI summarization
-    
-    Returns:
-        If include_summary=False: List[Dict] (backward compatible)
-        If include_summary=True: Dict with 'results' and 'summary' keys
+    Search all requested sources, then rank and deduplicate the results
+    (cached per query; see SEARCH_CACHE_TTL)
     """
     if sources is None:
         sources = ['duckduckgo', 'bing']
     
+    cache_key = _search_cache_key(query, sources, max_results, bing_api_key)
+    cached = _cache_get(_search_cache, cache_key)
+    if cached is not None:
+        return cached
+    
     # Search all sources in parallel
     search_tasks = []
     
     if 'duckduckgo' in sources:
-        search_tasks.append(search_duckduckgo(query, max_results=max_results))
+        search_tasks.append(_search_source('duckduckgo', search_duckduckgo(query, max_results=max_results)))
     
     if 'bing' in sources:
-        search_tasks.append(search_bing(query, max_results=max_results, api_key=bing_api_key))
+        search_tasks.append(_search_source('bing', search_bing(query, max_results=max_results, api_key=bing_api_key)))
     
-    # Wait for all searches to complete
-    all_results_lists = await asyncio.gather(*search_tasks, return_exceptions=True)
-    
-    # Flatten results
+    # Collect sources as they finish; once enough results are in, stop
+    # waiting on slower sources instead of letting the slowest dictate latency
+    pending = [asyncio.create_task(task) for task in search_tasks]
     all_results: List[SearchResult] = []
-    for results_list in all_results_lists:
-        if isinstance(results_list, list):
-            all_results.extend(results_list)
-        elif isinstance(results_list, Exception):
-            logger.debug(f"Search source failed: {results_list}")
+    partial = False
+    try:
+        for next_done in asyncio.as_completed(pending):
+            all_results.extend(await next_done)
+            if len(all_results) >= max_results * SEARCH_EARLY_RETURN_RATIO:
+                break
+    finally:
+        unfinished = [task for task in pending if not task.done()]
+        partial = bool(unfinished)
+        for task in unfinished:
+            task.cancel()
+        await asyncio.gather(*unfinished, return_exceptions=True)
     
     # Rank and deduplicate
     ranked_results = rank_and_deduplicate_results(all_results, query, max_results)
     
-    # Convert to dict format with enhanced metadata
-    results = [
-        {
-            'title': r.title,
-            'url': r.url,
-            'snippet': r.snippet,
-            'source': r.source,
-            'relevance_score': round(r.relevance_score, 3),
-            'rank': idx + 1,
-            'domain': urlparse(r.url).netloc if r.url else '',
-        }
-        for idx, r in enumerate(ranked_results)
-    ]
+    # Don't cache empty result sets (usually every source failed)
+    if ranked_results:
+        ttl = SEARCH_PARTIAL_CACHE_TTL if partial else SEARCH_CACHE_TTL
+        _cache_set(_search_cache, cache_key, ranked_results, ttl)
+    
+    return ranked_results
+
+
+async def aggregate_search(
+    query: str,
+    sources: List[str] = None,
+    max_results: int = 20,
+    bing_api_key: Optional[str] = None,
+    include_summary: bool = False,
+    summary_length: int = 200,
+) -> Any:  # Returns List[Dict] or Dict[str, Any] depending on include_summary
+    """
+    Aggregate search results from multiple sources with optional AI summarization
+    
+    Returns:
+        If include_summary=False: List[Dict] (backward compatible)
+        If include_summary=True: Dict with 'results' and 'summary' keys
+    """
+    ranked_results = await search_ranked_results(query, sources, max_results, bing_api_key)
+    results = results_to_dicts(ranked_results)
     
     # Generate AI summary if requested
     if include_summary:
-        summary = await summarize_search_results(query, results, summary_length)
+        summary = await summarize_search_results(query, ranked_results, summary_length)
         return {
             'results': results,
             'summary': summary,
@@ -511,4 +884,3 @@ async def aggregate_search(
     
     # Backward compatible: return list if summary not requested
     return results
-
@@ -0,0 +1,64 @@
+"""
+System Metrics Sampler - Non-blocking CPU and memory readings for request handlers
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# How long each background CPU measurement spans, in seconds
+SAMPLE_INTERVAL = float(os.getenv("SYSTEM_METRICS_SAMPLE_INTERVAL", "0.5"))
+
+_cpu_percent: float = 0.0
+_virtual_memory = None
+_sampler: threading.Thread | None = None
+_sampler_lock = threading.Lock()
+
+
+def _sample_forever() -> None:
+    """Refresh the readings; the measurement window blocks only this thread"""
+    global _cpu_percent, _virtual_memory
+    while True:
+        try:
+            _cpu_percent = psutil.cpu_percent(interval=SAMPLE_INTERVAL) or 0.0
+            _virtual_memory = psutil.virtual_memory()
+        except Exception as e:
+            # Keep the thread alive; a transient psutil failure shouldn't freeze the readings
+            logger.warning("System metrics sampling failed: %s", e)
+            time.sleep(SAMPLE_INTERVAL)
+
+
+def _ensure_sampler() -> None:
+    global _sampler
+    if _sampler is not None and _sampler.is_alive():
+        return
+    with _sampler_lock:
+        if _sampler is None or not _sampler.is_alive():
+            _sampler = threading.Thread(target=_sample_forever, name="system-metrics", daemon=True)
+            _sampler.start()
+
+
+def cpu_percent() -> float:
+    """
+    Latest system-wide CPU percent, without blocking the caller.
+    Reads 0.0 until the first sample window has elapsed.
+    """
+    _ensure_sampler()
+    return _cpu_percent
+
+
+def virtual_memory():
+    """
+    Latest psutil.virtual_memory() snapshot, at most one sample window old.
+    Read directly until the sampler has taken its first one.
+    """
+    _ensure_sampler()
+    snapshot = _virtual_memory
+    return snapshot if snapshot is not None else psutil.virtual_memory()
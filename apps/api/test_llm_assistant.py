@@ -3,184 +3,190 @@ Test LLM Assistant API Endpoints
 """
 
 import asyncio
+import contextlib
 import httpx
-import json
+import orjson
 import sys
 
 API_URL = "http://localhost:8000"
 
 
-async def test_page_extraction():
+async def iter_sse_events(response: httpx.Response):
+    """Yield decoded JSON payloads from the ``data:`` lines of an SSE response"""
+    buf = bytearray()
+    async for chunk in response.aiter_bytes():
+        buf += chunk
+        while (nl := buf.find(b"\n")) != -1:
+            line = bytes(buf[:nl]).rstrip(b"\r")
+            del buf[:nl + 1]
+            if line.startswith(b"data: "):
+                try:
+                    yield orjson.loads(line[6:])
+                except orjson.JSONDecodeError:
+                    pass
+
+
+async def test_page_extraction(client: httpx.AsyncClient):
     """Test page content extraction"""
     print("\n📄 Testing Page Extraction...")
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{API_URL}/extract/extract",
-                json={"url": "https://en.wikipedia.org/wiki/TypeScript"},
-            )
-            response.raise_for_status()
-            data = response.json()
-            print("✅ Page extraction successful")
-            print(f"   Title: {data.get('title', 'N/A')}")
-            print(f"   Content length: {len(data.get('content', ''))} chars")
-            print(f"   Language: {data.get('lang', 'N/A')}")
-            return True
+        response = await client.post(
+            "/extract/extract",
+            json={"url": "https://en.wikipedia.org/wiki/TypeScript"},
+            timeout=30.0,
+        )
+        response.raise_for_status()
+        data = response.json()
+        print("✅ Page extraction successful")
+        print(f"   Title: {data.get('title', 'N/A')}")
+        print(f"   Content length: {len(data.get('content', ''))} chars")
+        print(f"   Language: {data.get('lang', 'N/A')}")
+        return True
     except Exception as e:
         print(f"❌ Page extraction failed: {e}")
         return False
 
 
-async def test_ask_about_page():
+async def test_ask_about_page(client: httpx.AsyncClient):
     """Test ask about page endpoint"""
     print("\n❓ Testing Ask About Page...")
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{API_URL}/llm/ask-about-page",
-                json={
-                    "prompt": "What is TypeScript?",
-                    "url": "https://en.wikipedia.org/wiki/TypeScript",
-                },
-            )
+        async with client.stream(
+            "POST",
+            "/llm/ask-about-page",
+            json={
+                "prompt": "What is TypeScript?",
+                "url": "https://en.wikipedia.org/wiki/TypeScript",
+            },
+        ) as response:
             response.raise_for_status()
             
             # Handle SSE stream
-            answer = ""
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    try:
-                        data = json.loads(line[6:])
-                        if data.get("type") == "token" and data.get("text"):
-                            answer += data["text"]
-                        elif data.get("type") == "done":
-                            break
-                    except:
-                        pass
+            parts: list[str] = []
+            async for data in iter_sse_events(response):
+                if data.get("type") == "token" and data.get("text"):
+                    parts.append(data["text"])
+                elif data.get("type") == "done":
+                    break
+            answer = "".join(parts)
             
-            print("✅ Ask about page successful")
-            print(f"   Answer length: {len(answer)} chars")
-            if answer:
-                print(f"   Preview: {answer[:100]}...")
-            return True
+        print("✅ Ask about page successful")
+        print(f"   Answer length: {len(answer)} chars")
+        if answer:
+            print(f"   Preview: {answer[:100]}...")
+        return True
     except Exception as e:
         print(f"❌ Ask about page failed: {e}")
         return False
 
 
-async def test_page_summarization():
+async def test_page_summarization(client: httpx.AsyncClient):
     """Test page summarization endpoint"""
     print("\n📝 Testing Page Summarization...")
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{API_URL}/llm/summarize-page",
-                json={
-                    "url": "https://en.wikipedia.org/wiki/TypeScript",
-                    "style": "concise",
-                    "max_length": 100,
-                },
-            )
+        async with client.stream(
+            "POST",
+            "/llm/summarize-page",
+            json={
+                "url": "https://en.wikipedia.org/wiki/TypeScript",
+                "style": "concise",
+                "max_length": 100,
+            },
+        ) as response:
             response.raise_for_status()
             
             # Handle SSE stream
-            summary = ""
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    try:
-                        data = json.loads(line[6:])
-                        if data.get("type") == "token" and data.get("text"):
-                            summary += data["text"]
-                        elif data.get("type") == "done":
-                            break
-                    except:
-                        pass
+            parts: list[str] = []
+            async for data in iter_sse_events(response):
+                if data.get("type") == "token" and data.get("text"):
+                    parts.append(data["text"])
+                elif data.get("type") == "done":
+                    break
+            summary = "".join(parts)
             
-            print("✅ Page summarization successful")
-            print(f"   Summary length: {len(summary)} chars")
-            if summary:
-                print(f"   Summary: {summary[:200]}...")
-            return True
+        print("✅ Page summarization successful")
+        print(f"   Summary length: {len(summary)} chars")
+        if summary:
+            print(f"   Summary: {summary[:200]}...")
+        return True
     except Exception as e:
         print(f"❌ Page summarization failed: {e}")
         return False
 
 
-async def test_llm_assistant():
+async def test_llm_assistant(client: httpx.AsyncClient):
     """Test general LLM assistant endpoint"""
     print("\n🤖 Testing LLM Assistant...")
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{API_URL}/llm/assistant",
-                json={
-                    "prompt": "Explain quantum computing in simple terms",
-                    "context": "Quantum computing uses quantum mechanics principles",
-                    "stream": False,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            print("✅ LLM Assistant successful")
-            print(f"   Model: {data.get('model', 'N/A')}")
-            print(f"   Response length: {len(data.get('response', ''))} chars")
-            if data.get("response"):
-                print(f"   Preview: {data['response'][:100]}...")
-            return True
+        response = await client.post(
+            "/llm/assistant",
+            json={
+                "prompt": "Explain quantum computing in simple terms",
+                "context": "Quantum computing uses quantum mechanics principles",
+                "stream": False,
+            },
+            timeout=30.0,
+        )
+        response.raise_for_status()
+        data = response.json()
+        print("✅ LLM Assistant successful")
+        print(f"   Model: {data.get('model', 'N/A')}")
+        print(f"   Response length: {len(data.get('response', ''))} chars")
+        if data.get("response"):
+            print(f"   Preview: {data['response'][:100]}...")
+        return True
     except Exception as e:
         print(f"❌ LLM Assistant failed: {e}")
         return False
 
 
-async def test_ai_search():
+async def test_ai_search(client: httpx.AsyncClient):
     """Test AI search endpoint"""
     print("\n🔍 Testing AI Search...")
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{API_URL}/search/ai-search",
-                json={
-                    "query": "React performance optimization",
-                    "max_results": 10,
-                    "include_summary": True,
-                    "stream": False,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            print("✅ AI Search successful")
-            print(f"   Total results: {data.get('total_results', 0)}")
-            if data.get("summary"):
-                print(f"   Summary length: {len(data['summary'])} chars")
-                print(f"   Summary preview: {data['summary'][:100]}...")
-            return True
+        response = await client.post(
+            "/search/ai-search",
+            json={
+                "query": "React performance optimization",
+                "max_results": 10,
+                "include_summary": True,
+                "stream": False,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        print("✅ AI Search successful")
+        print(f"   Total results: {data.get('total_results', 0)}")
+        if data.get("summary"):
+            print(f"   Summary length: {len(data['summary'])} chars")
+            print(f"   Summary preview: {data['summary'][:100]}...")
+        return True
     except Exception as e:
         print(f"❌ AI Search failed: {e}")
         return False
 
 
-async def test_search_with_summary():
+async def test_search_with_summary(client: httpx.AsyncClient):
     """Test search endpoint with summary"""
     print("\n🔎 Testing Search with Summary...")
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{API_URL}/search",
-                json={
-                    "query": "TypeScript best practices",
-                    "max_results": 15,
-                    "include_summary": True,
-                    "summary_length": 150,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            print("✅ Search with summary successful")
-            print(f"   Total results: {data.get('total_results', 0)}")
-            print(f"   Sources used: {', '.join(data.get('sources_used', []))}")
-            if data.get("summary"):
-                print(f"   Summary: {data['summary'][:150]}...")
-            return True
+        response = await client.post(
+            "/search",
+            json={
+                "query": "TypeScript best practices",
+                "max_results": 15,
+                "include_summary": True,
+                "summary_length": 150,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        print("✅ Search with summary successful")
+        print(f"   Total results: {data.get('total_results', 0)}")
+        print(f"   Sources used: {', '.join(data.get('sources_used', []))}")
+        if data.get("summary"):
+            print(f"   Summary: {data['summary'][:150]}...")
+        return True
     except Exception as e:
         print(f"❌ Search with summary failed: {e}")
         return False
@@ -191,16 +197,35 @@ async def run_all_tests():
     print("🧪 Starting LLM Assistant & AI Search Tests")
     print(f"API URL: {API_URL}\n")
 
-    results = {
-        "page_extraction": await test_page_extraction(),
-        "ask_about_page": await test_ask_about_page(),
-        "page_summarization": await test_page_summarization(),
-        "llm_assistant": await test_llm_assistant(),
-        "ai_search": await test_ai_search(),
-        "search_with_summary": await test_search_with_summary(),
+    tests = {
+        "page_extraction": test_page_extraction,
+        "ask_about_page": test_ask_about_page,
+        "page_summarization": test_page_summarization,
+        "llm_assistant": test_llm_assistant,
+        "ai_search": test_ai_search,
+        "search_with_summary": test_search_with_summary,
     }
 
-    passed = sum(1 for v in results.values() if v)
+    # The endpoints are independent, so run them concurrently; a test that
+    # raises is counted as failed without cancelling the others. One shared
+    # client lets every test reuse pooled keep-alive connections.
+    async with httpx.AsyncClient(
+        base_url=API_URL,
+        timeout=60.0,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    ) as client:
+        # Open a pooled connection up front so the concurrent tests don't
+        # all race to connect
+        with contextlib.suppress(httpx.HTTPError):
+            await client.get("/health", timeout=5.0)
+
+        outcomes = await asyncio.gather(
+            *(test(client) for test in tests.values()),
+            return_exceptions=True,
+        )
+    results = {name: outcome is True for name, outcome in zip(tests, outcomes)}
+
+    passed = sum(results.values())
     total = len(results)
 
     print("\n" + "=" * 50)
@@ -221,6 +246,11 @@ async def run_all_tests():
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     exit_code = asyncio.run(run_all_tests())
     sys.exit(exit_code)
 
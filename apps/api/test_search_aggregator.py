@@ -0,0 +1,55 @@
+from apps.api.services import search_aggregator
+
+
+# Trimmed from html.duckduckgo.com/html/ output: the result__extras divs sit
+# between the title link and the snippet inside each result container
+DDG_HTML = """
+<div id="links" class="results">
+  <div class="result results_links results_links_deep web-result ">
+    <div class="links_main links_deep result__body">
+      <h2 class="result__title">
+        <a rel="nofollow" class="result__a" href="https://www.python.org/">Welcome to <b>Python</b>.org</a>
+      </h2>
+      <div class="result__extras">
+        <div class="result__extras__url">
+          <a class="result__url" href="https://www.python.org/">www.python.org</a>
+        </div>
+      </div>
+      <a class="result__snippet" href="https://www.python.org/">The official home of the <b>Python</b> Programming Language &amp; more</a>
+      <div class="clear"></div>
+    </div>
+  </div>
+  <div class="result results_links results_links_deep web-result ">
+    <div class="links_main links_deep result__body">
+      <h2 class="result__title">
+        <a rel="nofollow" class="result__a" href="https://docs.python.org/3/">3.12 Documentation</a>
+      </h2>
+      <div class="result__extras">
+        <div class="result__extras__url">
+          <a class="result__url" href="https://docs.python.org/3/">docs.python.org/3</a>
+        </div>
+      </div>
+      <a class="result__snippet" href="https://docs.python.org/3/">Python 3 documentation</a>
+      <div class="clear"></div>
+    </div>
+  </div>
+</div>
+"""
+
+
+def test_parse_duckduckgo_html_regex_fallback(monkeypatch):
+    monkeypatch.setattr(search_aggregator, "HTMLParser", None)
+
+    results = search_aggregator._parse_duckduckgo_html(DDG_HTML, start=0, limit=10)
+
+    assert [r.url for r in results] == ["https://www.python.org/", "https://docs.python.org/3/"]
+    assert results[0].title == "Welcome to Python.org"
+    assert results[0].snippet == "The official home of the Python Programming Language & more"
+    assert [r.rank for r in results] == [0, 1]
+
+
+def test_split_blocks_ignores_result_children():
+    blocks = list(search_aggregator._split_blocks(DDG_HTML, search_aggregator._DDG_RESULT_MARKER))
+
+    assert len(blocks) == 2
+    assert all("result__a" in block and "result__snippet" in block for block in blocks)
@@ -0,0 +1,13 @@
+-- Migration: Partial index for the frontier claim query
+-- Workers claim the highest-scored queued rows:
+--   WHERE state = 'queued' AND attempt_count < $max ORDER BY score DESC, id DESC
+--   FOR UPDATE SKIP LOCKED LIMIT $n
+-- Indexing only queued rows keeps the index small as done/error rows pile up,
+-- so the claim is a short ordered walk from the top of this index.
+-- attempt_count is left out of the predicate so the index stays valid whatever
+-- MAX_ATTEMPTS a worker is configured with; exhausted rows are filtered on the walk.
+
+CREATE INDEX IF NOT EXISTS idx_frontier_queued_score ON frontier(score DESC, id DESC)
+  WHERE state = 'queued';
+
+COMMENT ON INDEX idx_frontier_queued_score IS 'Claim order for queued frontier items (partial: state = queued)';
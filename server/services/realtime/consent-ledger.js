@@ -3,10 +3,48 @@
 
 const fs = require('fs');
 const path = require('path');
-const LEDGER_PATH = path.resolve(__dirname, '../../userData/consent-ledger.json');
-const BACKUP_PATH = path.resolve(__dirname, '../../userData/consent-ledger.backup.json');
+// Append-only JSON Lines: one entry per line, so adding an entry writes only that entry
+const LEDGER_PATH = path.resolve(__dirname, '../../userData/consent-ledger.jsonl');
+const BACKUP_PATH = path.resolve(__dirname, '../../userData/consent-ledger.backup.jsonl');
+// Ledgers written before the switch to JSON Lines
+const LEGACY_LEDGER_PATH = path.resolve(__dirname, '../../userData/consent-ledger.json');
 const EventEmitter = require('events');
 
+function readLines(file) {
+  const entries = [];
+  const lines = fs.readFileSync(file, 'utf8').split('\n');
+  lines.forEach((line, i) => {
+    if (!line.trim()) return;
+    try {
+      entries.push(JSON.parse(line));
+    } catch {
+      // A torn line from an interrupted append; the entries around it are intact
+      console.warn(`[ConsentLedger] Skipping unreadable line ${i + 1} of ${file}`);
+    }
+  });
+  return entries;
+}
+
+// Append one line, first terminating a torn last line so the new entry
+// starts on a line of its own instead of being glued onto the fragment
+function appendLine(file, line) {
+  let prefix = '';
+  if (fs.existsSync(file)) {
+    const { size } = fs.statSync(file);
+    if (size > 0) {
+      const fd = fs.openSync(file, 'r');
+      try {
+        const last = Buffer.alloc(1);
+        fs.readSync(fd, last, 0, 1, size - 1);
+        if (last[0] !== 0x0a) prefix = '\n';
+      } finally {
+        fs.closeSync(fd);
+      }
+    }
+  }
+  fs.appendFileSync(file, prefix + line);
+}
+
 class ConsentLedger extends EventEmitter {
   constructor(eventBus) {
     super();
@@ -17,18 +55,31 @@ class ConsentLedger extends EventEmitter {
 
   load() {
     if (fs.existsSync(LEDGER_PATH)) {
-      this.ledger = JSON.parse(fs.readFileSync(LEDGER_PATH, 'utf8'));
+      this.ledger = readLines(LEDGER_PATH);
+    } else if (fs.existsSync(LEGACY_LEDGER_PATH)) {
+      this.ledger = JSON.parse(fs.readFileSync(LEGACY_LEDGER_PATH, 'utf8'));
+      this.save();
     }
   }
 
   save() {
-    fs.writeFileSync(LEDGER_PATH, JSON.stringify(this.ledger, null, 2));
-    fs.writeFileSync(BACKUP_PATH, JSON.stringify(this.ledger, null, 2));
+    // Full rewrite, only needed when migrating the legacy JSON array
+    const data = this.ledger.map(entry => JSON.stringify(entry) + '\n').join('');
+    fs.mkdirSync(path.dirname(LEDGER_PATH), { recursive: true });
+    fs.writeFileSync(LEDGER_PATH, data);
+    fs.writeFileSync(BACKUP_PATH, data);
+  }
+
+  append(entry) {
+    const line = JSON.stringify(entry) + '\n';
+    fs.mkdirSync(path.dirname(LEDGER_PATH), { recursive: true });
+    appendLine(LEDGER_PATH, line);
+    appendLine(BACKUP_PATH, line);
   }
 
   addEntry(entry) {
     this.ledger.push(entry);
-    this.save();
+    this.append(entry);
     this.emit('consent:ledger:updated', entry);
     this.eventBus.emit('consent:ledger:updated', entry);
   }
@@ -7,7 +7,10 @@ PR: Vector search integration
 
 import os
 import json
-import pickle
+import atexit
+import threading
+import time
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
 from flask import Flask, request, jsonify
 from flask_cors import CORS
@@ -28,66 +31,355 @@ CORS(app)
 # Storage
 VECTOR_DIM = 384  # Default embedding dimension (sentence-transformers)
 INDEX_FILE = os.getenv('FAISS_INDEX_FILE', 'faiss_index.bin')
-METADATA_FILE = os.getenv('FAISS_METADATA_FILE', 'faiss_metadata.json')
+# Vectors of the in-memory fallback, as a plain .npy array
+VECTORS_FILE = os.path.splitext(INDEX_FILE)[0] + '.npy'
+# Append-only JSON Lines, one entry per line
+METADATA_FILE = os.getenv('FAISS_METADATA_FILE', 'faiss_metadata.jsonl')
+if METADATA_FILE.endswith('.json'):
+    # A setting from before the switch to JSON Lines: that file becomes the legacy source
+    METADATA_FILE += 'l'
+# Metadata written before the switch to JSON Lines
+LEGACY_METADATA_FILE = os.path.splitext(METADATA_FILE)[0] + '.json'
+# Writes are coalesced: flush every SAVE_INTERVAL seconds, or sooner once
+# SAVE_EVERY entries are pending
+SAVE_INTERVAL = float(os.getenv('FAISS_SAVE_INTERVAL', 5))
+SAVE_EVERY = int(os.getenv('FAISS_SAVE_EVERY', 1000))
+# 'hnsw' (graph-based approximate search, ~log N per query) or 'flat' (exact, O(N) per query)
+INDEX_TYPE = os.getenv('FAISS_INDEX_TYPE', 'hnsw').lower()
+HNSW_M = int(os.getenv('FAISS_HNSW_M', 32))
+# Candidates explored per HNSW query; raise for recall, lower for latency
+HNSW_EF_SEARCH = int(os.getenv('FAISS_HNSW_EF_SEARCH', 64))
+# Store vectors as float16: half the memory and scan bandwidth, negligible recall loss
+# for sentence embeddings. Applies to newly created indexes.
+USE_FP16 = os.getenv('FAISS_FP16', 'false').lower() == 'true'
 
 # In-memory fallback
 if not FAISS_AVAILABLE:
-    vectors: List[np.ndarray] = []
+    # Rows [0, vector_count) are live; capacity doubles when full
+    vectors: np.ndarray = np.empty((1024, VECTOR_DIM), dtype=np.float32)
+    vector_count = 0
     metadata_list: List[Dict[str, Any]] = []
 else:
     index: Optional[faiss.Index] = None
     metadata_list: List[Dict[str, Any]] = []
 
 
+
+class ReadWriteLock:
+    """Any number of concurrent readers or one writer; a waiting writer holds off new readers"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+# Searches and flushes share the store; adds and clears need it to themselves
+store_lock = ReadWriteLock()
+# Serialises flushes (background thread, early flush, exit) against each other
+save_lock = threading.Lock()
+# Entries already in METADATA_FILE; everything after is pending
+persisted_count = 0
+# Index changes not yet written to INDEX_FILE
+dirty = False
+
+
 def initialize_index(dimension: int = VECTOR_DIM):
     """Initialize FAISS index"""
     global index
     if FAISS_AVAILABLE:
-        index = faiss.IndexFlatL2(dimension)
-        print(f'✅ FAISS index initialized (dimension={dimension})')
+        if INDEX_TYPE == 'flat' and USE_FP16:
+            index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+        elif INDEX_TYPE == 'flat':
+            index = faiss.IndexFlatL2(dimension)
+        elif USE_FP16:
+            index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_fp16, HNSW_M)
+        else:
+            index = faiss.IndexHNSWFlat(dimension, HNSW_M)
+        if hasattr(index, 'hnsw'):
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+        storage = 'fp16' if USE_FP16 else 'fp32'
+        print(f'✅ FAISS {INDEX_TYPE} index initialized (dimension={dimension}, storage={storage})')
     else:
         print('✅ In-memory index initialized')
 
 
 def load_index():
     """Load index from disk"""
-    global index, metadata_list
+    global index, metadata_list, persisted_count, dirty
     
     if os.path.exists(INDEX_FILE) and FAISS_AVAILABLE:
         try:
             index = faiss.read_index(INDEX_FILE)
+            if hasattr(index, 'hnsw'):
+                index.hnsw.efSearch = HNSW_EF_SEARCH
             print(f'✅ Loaded FAISS index from {INDEX_FILE}')
         except Exception as e:
             print(f'⚠️  Failed to load index: {e}')
             initialize_index()
     else:
         initialize_index()
+        if not FAISS_AVAILABLE and os.path.exists(VECTORS_FILE):
+            try:
+                # Memory-mapped so the file is copied straight into the store, never unpickled
+                append_vectors(np.load(VECTORS_FILE, mmap_mode='r'))
+                print(f'✅ Loaded {vector_count} vectors from {VECTORS_FILE}')
+            except Exception as e:
+                print(f'⚠️  Failed to load vectors: {e}')
     
     if os.path.exists(METADATA_FILE):
         try:
-            with open(METADATA_FILE, 'r') as f:
+            metadata_list = []
+            with open(METADATA_FILE, 'rb') as f:
+                data = f.read()
+            if data.lstrip()[:1] == b'[':
+                # A legacy JSON array under the JSON Lines name; rewritten on the next flush
+                metadata_list = json.loads(data)
+                persisted_count = 0
+                dirty = True
+                print(f'✅ Loaded {len(metadata_list)} metadata entries from legacy array in {METADATA_FILE}')
+                data = b''
+            complete = data.rfind(b'\n') + 1
+            if complete == 0 and data:
+                # Not a single complete line; leave the file alone, it is rewritten on the next flush
+                print(f'⚠️  Ignoring incomplete metadata file {METADATA_FILE} ({len(data)} bytes)')
+            elif complete < len(data):
+                # Cut off a torn final line left by an interrupted append, so the next
+                # append starts on a fresh line instead of being glued onto the fragment
+                print(f'⚠️  Dropping incomplete last metadata line ({len(data) - complete} bytes)')
+                with open(METADATA_FILE, 'r+b') as f:
+                    f.truncate(complete)
+            for line in data[:complete].decode('utf-8').splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    metadata_list.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Entry ids are positions in the index, so keep the slot
+                    print(f'⚠️  Unreadable metadata line for entry {len(metadata_list)}; keeping a placeholder')
+                    metadata_list.append({'id': len(metadata_list), 'text': '', 'metadata': {}})
+            if complete:
+                persisted_count = len(metadata_list)
+                print(f'✅ Loaded {len(metadata_list)} metadata entries')
+        except Exception as e:
+            print(f'⚠️  Failed to load metadata: {e}')
+            metadata_list = []
+    elif os.path.exists(LEGACY_METADATA_FILE):
+        try:
+            with open(LEGACY_METADATA_FILE, 'r') as f:
                 metadata_list = json.load(f)
-            print(f'✅ Loaded {len(metadata_list)} metadata entries')
+            # Rewritten as JSON Lines on the next flush
+            persisted_count = 0
+            dirty = True
+            print(f'✅ Loaded {len(metadata_list)} metadata entries from {LEGACY_METADATA_FILE}')
         except Exception as e:
             print(f'⚠️  Failed to load metadata: {e}')
             metadata_list = []
+    
+    stored = index.ntotal if FAISS_AVAILABLE and index is not None else vector_count
+    if stored > len(metadata_list):
+        # Metadata is appended after the vectors are saved, so a torn flush leaves
+        # vectors without entries; placeholders keep new ids aligned with index positions
+        print(f'⚠️  {stored} stored vectors but {len(metadata_list)} metadata entries; padding with placeholders')
+        metadata_list.extend({'id': i, 'text': '', 'metadata': {}} for i in range(len(metadata_list), stored))
+    elif stored < len(metadata_list):
+        print(f'⚠️  {stored} stored vectors but {len(metadata_list)} metadata entries; results past the shorter one are dropped')
 
 
 def save_index():
-    """Save index to disk"""
-    if FAISS_AVAILABLE and index is not None:
+    """Write pending changes to disk: the index is replaced atomically, metadata is appended"""
+    global persisted_count, dirty
+    # Only reads the store, so searches keep running while the files are written
+    with save_lock, store_lock.read():
+        if not dirty and persisted_count == len(metadata_list):
+            return
+        
+        if FAISS_AVAILABLE and index is not None:
+            try:
+                tmp_file = INDEX_FILE + '.tmp'
+                faiss.write_index(index, tmp_file)
+                os.replace(tmp_file, INDEX_FILE)
+            except Exception as e:
+                print(f'⚠️  Failed to save index: {e}')
+                return
+        elif not FAISS_AVAILABLE:
+            try:
+                tmp_file = VECTORS_FILE + '.tmp'
+                with open(tmp_file, 'wb') as f:
+                    np.save(f, vectors[:vector_count])
+                os.replace(tmp_file, VECTORS_FILE)
+            except Exception as e:
+                print(f'⚠️  Failed to save vectors: {e}')
+                return
+        
         try:
-            faiss.write_index(index, INDEX_FILE)
-            print(f'✅ Saved FAISS index to {INDEX_FILE}')
+            # persisted_count == 0 means the file is rewritten (after clear or migration)
+            mode = 'a' if persisted_count else 'w'
+            with open(METADATA_FILE, mode) as f:
+                for entry in metadata_list[persisted_count:]:
+                    f.write(json.dumps(entry) + '\n')
+            persisted_count = len(metadata_list)
+            dirty = False
         except Exception as e:
-            print(f'⚠️  Failed to save index: {e}')
+            print(f'⚠️  Failed to save metadata: {e}')
+
+
+def mark_dirty() -> bool:
+    """Record an index change (caller holds the write lock); True once SAVE_EVERY entries are pending"""
+    global dirty
+    dirty = True
+    return len(metadata_list) - persisted_count >= SAVE_EVERY
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(SAVE_INTERVAL)
+        save_index()
+
+
+def start_flusher():
+    """Start the background thread that coalesces index writes"""
+    threading.Thread(target=_flush_periodically, name='faiss-flush', daemon=True).start()
+    atexit.register(save_index)
+
+
+def append_vectors(batch: np.ndarray):
+    """Copy a batch into the in-memory fallback matrix, growing it geometrically"""
+    global vectors, vector_count
+    needed = vector_count + len(batch)
+    if needed > len(vectors):
+        grown = np.empty((max(needed, 2 * len(vectors)), VECTOR_DIM), dtype=np.float32)
+        grown[:vector_count] = vectors[:vector_count]
+        vectors = grown
+    vectors[vector_count:needed] = batch
+    vector_count = needed
+
+
+def add_vectors(batch: np.ndarray, items: List[Dict[str, Any]]) -> List[int]:
+    """Add a (B, VECTOR_DIM) float32 batch in one index call; returns the new entry ids"""
+    with store_lock.write():
+        if FAISS_AVAILABLE and index is not None:
+            index.add(batch)
+        else:
+            append_vectors(batch)
+        
+        ids = []
+        for item in items:
+            entry_id = len(metadata_list)
+            metadata_list.append({
+                'id': entry_id,
+                'text': item['text'],
+                'metadata': item.get('metadata', {}),
+            })
+            ids.append(entry_id)
+        
+        flush_now = mark_dirty()
     
-    try:
-        with open(METADATA_FILE, 'w') as f:
-            json.dump(metadata_list, f)
-        print(f'✅ Saved metadata to {METADATA_FILE}')
-    except Exception as e:
-        print(f'⚠️  Failed to save metadata: {e}')
+    if flush_now:
+        save_index()
+    return ids
+
+
+def search_vectors(queries: np.ndarray, k: int) -> List[List[Dict[str, Any]]]:
+    """
+    Search a (B, VECTOR_DIM) float32 batch of queries; returns one result list per query.
+    k is clamped to the number of vectors that have metadata.
+    """
+    with store_lock.read():
+        if FAISS_AVAILABLE and index is not None:
+            k = min(k, index.ntotal, len(metadata_list))
+            if k <= 0:
+                return [[] for _ in queries]
+            distances, indices = index.search(queries, k)
+            batch_results = []
+            for row_distances, row_indices in zip(distances, indices):
+                results = []
+                for distance, idx in zip(row_distances, row_indices):
+                    # Approximate indexes pad missing neighbours with -1
+                    if 0 <= idx < len(metadata_list):
+                        results.append({
+                            'id': metadata_list[idx]['id'],
+                            'text': metadata_list[idx]['text'],
+                            'score': float(distance),
+                            'metadata': metadata_list[idx].get('metadata', {}),
+                        })
+                batch_results.append(results)
+            return batch_results
+        
+        # In-memory search: one vectorized distance pass per query, then a
+        # partial sort that only orders the k nearest
+        searchable = min(vector_count, len(metadata_list))
+        live = vectors[:searchable]
+        k = min(k, searchable)
+        batch_results = []
+        for query in queries:
+            if k <= 0:
+                batch_results.append([])
+                continue
+            distances = np.linalg.norm(live - query, axis=1)
+            nearest = np.argpartition(distances, k - 1)[:k] if k < searchable else np.arange(searchable)
+            nearest = nearest[np.argsort(distances[nearest])]
+            batch_results.append([
+                {
+                    'id': int(i),
+                    'text': metadata_list[i]['text'],
+                    'score': float(distances[i]),
+                    'metadata': metadata_list[i].get('metadata', {}),
+                }
+                for i in nearest
+            ])
+        return batch_results
+
+
+def parse_k(value: Any) -> Optional[int]:
+    """Neighbour count from a JSON body or query string; None unless it is a positive integer"""
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        return None
+    return value
+
+
+def raw_vectors() -> Optional[np.ndarray]:
+    """
+    Decode an application/octet-stream body of packed little-endian float32 vectors
+    into a (B, VECTOR_DIM) array without a JSON round-trip. None if the size is wrong.
+    """
+    body = request.get_data()
+    row_bytes = VECTOR_DIM * 4
+    if not body or len(body) % row_bytes:
+        return None
+    return np.frombuffer(body, dtype='<f4').reshape(-1, VECTOR_DIM).astype(np.float32, copy=False)
 
 
 @app.route('/health', methods=['GET'])
@@ -126,25 +418,50 @@ def add_embedding():
                 'error': f'Embedding dimension mismatch. Expected {VECTOR_DIM}, got {embedding_array.shape[0]}',
             }), 400
 
-        # Add to index
-        if FAISS_AVAILABLE and index is not None:
-            embedding_2d = embedding_array.reshape(1, -1)
-            index.add(embedding_2d)
-        else:
-            vectors.append(embedding_array)
+        [entry_id] = add_vectors(
+            embedding_array.reshape(1, -1),
+            [{'text': text, 'metadata': metadata}],
+        )
 
-        # Store metadata
-        entry_id = len(metadata_list)
-        metadata_list.append({
+        return jsonify({
             'id': entry_id,
-            'text': text,
-            'metadata': metadata,
+            'status': 'added',
         })
 
-        save_index()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/v1/add_batch', methods=['POST'])
+def add_embeddings_batch():
+    """
+    Add many embeddings with a single index call
+    Body: { "items": [{ "text": "...", "embedding": [...], "metadata": {...} }, ...] }
+    """
+    try:
+        data = request.get_json()
+        items = data.get('items', [])
+
+        if not items:
+            return jsonify({'error': 'items is required'}), 400
+
+        for i, item in enumerate(items):
+            if not item.get('text'):
+                return jsonify({'error': f'items[{i}].text is required'}), 400
+            if not item.get('embedding'):
+                return jsonify({'error': f'items[{i}].embedding is required'}), 400
+
+        batch = np.array([item['embedding'] for item in items], dtype=np.float32)
+
+        if batch.ndim != 2 or batch.shape[1] != VECTOR_DIM:
+            return jsonify({
+                'error': f'Embedding dimension mismatch. Expected {VECTOR_DIM} for every item',
+            }), 400
+
+        ids = add_vectors(batch, items)
 
         return jsonify({
-            'id': entry_id,
+            'ids': ids,
             'status': 'added',
         })
 
@@ -157,15 +474,32 @@ def search():
     """
     Search for similar embeddings
     Body: { "query_embedding": [0.1, 0.2, ...], "k": 5 }
+      or: application/octet-stream of VECTOR_DIM float32 values, with ?k=5
     """
     try:
+        if request.mimetype == 'application/octet-stream':
+            query_array = raw_vectors()
+            if query_array is None or len(query_array) != 1:
+                return jsonify({'error': f'Body must be {VECTOR_DIM} float32 values'}), 400
+            k = parse_k(request.args.get('k', 5))
+            if k is None:
+                return jsonify({'error': 'k must be a positive integer'}), 400
+            [results] = search_vectors(query_array, k)
+            return jsonify({
+                'results': results,
+                'count': len(results),
+            })
+
         data = request.get_json()
         query_embedding = data.get('query_embedding', [])
-        k = data.get('k', 5)
+        k = parse_k(data.get('k', 5))
 
         if not query_embedding:
             return jsonify({'error': 'query_embedding is required'}), 400
 
+        if k is None:
+            return jsonify({'error': 'k must be a positive integer'}), 400
+
         query_array = np.array(query_embedding, dtype=np.float32).reshape(1, -1)
 
         if query_array.shape[1] != VECTOR_DIM:
@@ -173,31 +507,7 @@ def search():
                 'error': f'Query dimension mismatch. Expected {VECTOR_DIM}, got {query_array.shape[1]}',
             }), 400
 
-        # Search
-        if FAISS_AVAILABLE and index is not None:
-            distances, indices = index.search(query_array, min(k, len(metadata_list)))
-            results = []
-            for i, idx in enumerate(indices[0]):
-                if idx < len(metadata_list):
-                    results.append({
-                        'id': metadata_list[idx]['id'],
-                        'text': metadata_list[idx]['text'],
-                        'score': float(distances[0][i]),
-                        'metadata': metadata_list[idx].get('metadata', {}),
-                    })
-        else:
-            # In-memory search
-            results = []
-            for i, vec in enumerate(vectors):
-                distance = np.linalg.norm(query_array[0] - vec)
-                results.append({
-                    'id': i,
-                    'text': metadata_list[i]['text'],
-                    'score': float(distance),
-                    'metadata': metadata_list[i].get('metadata', {}),
-                })
-            results.sort(key=lambda x: x['score'])
-            results = results[:k]
+        [results] = search_vectors(query_array, k)
 
         return jsonify({
             'results': results,
@@ -208,17 +518,63 @@ def search():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/v1/search_batch', methods=['POST'])
+def search_batch():
+    """
+    Search many queries with a single index call
+    Body: { "query_embeddings": [[0.1, 0.2, ...], ...], "k": 5 }
+      or: application/octet-stream of B x VECTOR_DIM float32 values, with ?k=5
+    """
+    try:
+        if request.mimetype == 'application/octet-stream':
+            queries = raw_vectors()
+            if queries is None:
+                return jsonify({'error': f'Body must be a multiple of {VECTOR_DIM} float32 values'}), 400
+            k = parse_k(request.args.get('k', 5))
+        else:
+            data = request.get_json()
+            query_embeddings = data.get('query_embeddings', [])
+            k = parse_k(data.get('k', 5))
+
+            if not query_embeddings:
+                return jsonify({'error': 'query_embeddings is required'}), 400
+
+            queries = np.array(query_embeddings, dtype=np.float32)
+
+        if k is None:
+            return jsonify({'error': 'k must be a positive integer'}), 400
+
+        if queries.ndim != 2 or queries.shape[1] != VECTOR_DIM:
+            return jsonify({
+                'error': f'Query dimension mismatch. Expected {VECTOR_DIM} for every query',
+            }), 400
+
+        batch_results = search_vectors(queries, k)
+
+        return jsonify({
+            'results': batch_results,
+            'count': len(batch_results),
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/v1/clear', methods=['POST'])
 def clear():
     """Clear all embeddings"""
-    global index, metadata_list, vectors
+    global index, metadata_list, vectors, vector_count, persisted_count, dirty
     
-    if FAISS_AVAILABLE:
-        initialize_index()
-    else:
-        vectors = []
-    
-    metadata_list = []
+    with store_lock.write():
+        if FAISS_AVAILABLE:
+            initialize_index()
+        else:
+            vectors = np.empty((1024, VECTOR_DIM), dtype=np.float32)
+            vector_count = 0
+        
+        metadata_list = []
+        persisted_count = 0
+        dirty = True
     save_index()
     
     return jsonify({'status': 'cleared'})
@@ -231,6 +587,7 @@ def stats():
         'vector_count': len(metadata_list),
         'dimension': VECTOR_DIM,
         'faiss_available': FAISS_AVAILABLE,
+        'index_type': INDEX_TYPE if FAISS_AVAILABLE else 'memory',
         'index_file': INDEX_FILE if os.path.exists(INDEX_FILE) else None,
     })
 
@@ -240,5 +597,6 @@ if __name__ == '__main__':
     print(f'🚀 FAISS Service starting on port {port}')
     
     load_index()
+    start_flusher()
     
     app.run(host='0.0.0.0', port=port, debug=False)
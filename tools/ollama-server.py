@@ -12,6 +12,7 @@ import sys
 from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional, Dict, Any
 
 app = Flask(__name__)
@@ -19,17 +20,48 @@ CORS(app)
 
 OLLAMA_BASE_URL = os.getenv('OLLAMA_BASE_URL', 'http://127.0.0.1:11434')
 DEFAULT_MODEL = os.getenv('OLLAMA_MODEL', 'phi3:mini')
+# How long Ollama keeps a model loaded after a request (Ollama's own default is 5m,
+# after which the next request pays the full model load again)
+KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '24h')
+
+# One pooled session so every request reuses keep-alive connections to Ollama
+# instead of opening a new socket per call. It is shared by Flask's request
+# threads: the urllib3 pool behind the adapter is thread-safe, and nothing here
+# mutates session state (headers, cookies, auth) after import, so concurrent
+# get/post calls are safe.
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=32))
+session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=32))
 
 
 def check_ollama_available() -> bool:
     """Check if Ollama is running and accessible"""
     try:
-        response = requests.get(f'{OLLAMA_BASE_URL}/api/tags', timeout=2)
+        response = session.get(f'{OLLAMA_BASE_URL}/api/tags', timeout=2)
         return response.status_code == 200
     except:
         return False
 
 
+def warm_up_model():
+    """Load the default model now so the first real request doesn't pay for it"""
+    try:
+        session.post(
+            f'{OLLAMA_BASE_URL}/api/generate',
+            json={
+                'model': DEFAULT_MODEL,
+                'prompt': 'hi',
+                'stream': False,
+                'keep_alive': KEEP_ALIVE,
+                'options': {'num_predict': 1},
+            },
+            timeout=120,
+        )
+        print(f'🔥 Warmed up {DEFAULT_MODEL}')
+    except requests.exceptions.RequestException as e:
+        print(f'⚠️  Model warm-up failed: {e}')
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
@@ -62,13 +94,14 @@ def llm_query():
             'model': model,
             'prompt': prompt,
             'stream': False,
+            'keep_alive': KEEP_ALIVE,
             'options': {
                 'temperature': temperature,
                 'num_predict': max_tokens,
             },
         }
 
-        response = requests.post(
+        response = session.post(
             f'{OLLAMA_BASE_URL}/api/generate',
             json=ollama_payload,
             timeout=120,
@@ -116,12 +149,13 @@ def llm_query_stream():
             'model': model,
             'prompt': prompt,
             'stream': True,
+            'keep_alive': KEEP_ALIVE,
             'options': {
                 'temperature': temperature,
             },
         }
 
-        response = requests.post(
+        response = session.post(
             f'{OLLAMA_BASE_URL}/api/generate',
             json=ollama_payload,
             stream=True,
@@ -143,6 +177,9 @@ def llm_query_stream():
                             continue
             except Exception as e:
                 yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            finally:
+                # Hand the connection back to the pool
+                response.close()
 
         return Response(generate(), mimetype='text/event-stream')
 
@@ -155,23 +192,29 @@ def get_embeddings():
     """
     Get embeddings from Ollama
     Body: { "text": "...", "model": "..." }
+      or: { "texts": ["...", ...], "model": "..." } to embed a batch in one Ollama call
+    Both forms go through /api/embed, so a text gets the same (unit-length) vector
+    whether it is embedded alone or in a batch.
     """
     try:
         data = request.get_json()
         text = data.get('text', '')
+        texts = data.get('texts')
         model = data.get('model', 'nomic-embed-text')  # Default embedding model
 
+        if texts is not None:
+            return get_embeddings_batch(texts, model)
+
         if not text:
             return jsonify({'error': 'text is required'}), 400
 
-        ollama_payload = {
-            'model': model,
-            'prompt': text,
-        }
-
-        response = requests.post(
-            f'{OLLAMA_BASE_URL}/api/embeddings',
-            json=ollama_payload,
+        response = session.post(
+            f'{OLLAMA_BASE_URL}/api/embed',
+            json={
+                'model': model,
+                'input': text,
+                'keep_alive': KEEP_ALIVE,
+            },
             timeout=30,
         )
 
@@ -180,9 +223,9 @@ def get_embeddings():
                 'error': f'Ollama API error: {response.status_code}',
             }), 500
 
-        result = response.json()
+        embeddings = response.json().get('embeddings') or [[]]
         return jsonify({
-            'embedding': result.get('embedding', []),
+            'embedding': embeddings[0],
             'model': model,
             'provider': 'ollama',
         })
@@ -191,11 +234,39 @@ def get_embeddings():
         return jsonify({'error': str(e)}), 500
 
 
+def get_embeddings_batch(texts, model: str):
+    """Embed a list of texts with a single /api/embed request"""
+    if not isinstance(texts, list) or not texts or not all(isinstance(t, str) and t for t in texts):
+        return jsonify({'error': 'texts must be a non-empty list of strings'}), 400
+
+    response = session.post(
+        f'{OLLAMA_BASE_URL}/api/embed',
+        json={
+            'model': model,
+            'input': texts,
+            'keep_alive': KEEP_ALIVE,
+        },
+        timeout=30 + len(texts),
+    )
+
+    if response.status_code != 200:
+        return jsonify({
+            'error': f'Ollama API error: {response.status_code}',
+        }), 500
+
+    result = response.json()
+    return jsonify({
+        'embeddings': result.get('embeddings', []),
+        'model': model,
+        'provider': 'ollama',
+    })
+
+
 @app.route('/v1/models', methods=['GET'])
 def list_models():
     """List available Ollama models"""
     try:
-        response = requests.get(f'{OLLAMA_BASE_URL}/api/tags', timeout=5)
+        response = session.get(f'{OLLAMA_BASE_URL}/api/tags', timeout=5)
         if response.status_code == 200:
             data = response.json()
             models = [m['name'] for m in data.get('models', [])]
@@ -214,5 +285,7 @@ if __name__ == '__main__':
     
     if not check_ollama_available():
         print('⚠️  Warning: Ollama is not available. Start it with: ollama serve')
+    else:
+        warm_up_model()
     
     app.run(host='0.0.0.0', port=port, debug=False)